@@ -5,8 +5,13 @@ Gera mensagens inteligentes baseadas nas estatísticas e tendências encontradas
 Versão: 2.0 (Adaptado para estrutura achatada)
 """
 
-import pandas as pd
-from typing import Dict, Any
+from __future__ import annotations
+
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
+
+if TYPE_CHECKING:  # pandas só para anotação: o módulo não o importa em runtime
+    import pandas as pd
 
 
 class InsightsVendas:
@@ -14,12 +19,117 @@ class InsightsVendas:
     Classe responsável por gerar insights automáticos a partir das estatísticas.
     """
 
-    def gerar(self, df: pd.DataFrame, estatisticas: Dict[str, Any]) -> Dict[str, str]:
+    MESES = ("Jan", "Fev", "Mar", "Abr", "Mai", "Jun",
+             "Jul", "Ago", "Set", "Out", "Nov", "Dez")
+
+    # Templates das mensagens (montados uma vez, preenchidos com format_map)
+    _TPL_PRODUTO_CAMPEAO = (
+        "🏆 <strong>{nome}</strong> é o produto campeão, "
+        "gerando <strong>R$ {receita:,.2f}</strong> "
+        "({participacao:.1f}% do faturamento total)."
+    )
+    _TPL_PRODUTO_CAMPEAO_SEM_GMV = (
+        "🏆 <strong>{nome}</strong> é o produto campeão, "
+        "gerando <strong>R$ {receita:,.2f}</strong>."
+    )
+    _TPL_MELHOR_DIA = (
+        "📅 <strong>{dia}</strong> é o melhor dia para vendas, "
+        "com <strong>R$ {receita:,.2f}</strong> em receita acumulada."
+    )
+    _TPL_MELHOR_MES = (
+        "📆 O melhor mês foi <strong>{mes}/{ano}</strong>, "
+        "com <strong>R$ {receita:,.2f}</strong> em faturamento."
+    )
+    _TPL_CRESCIMENTO = (
+        "📈 Crescimento positivo de <strong>{valor:.1f}%</strong> "
+        "no período analisado!"
+    )
+    _TPL_QUEDA = (
+        "📉 Atenção: queda de <strong>{valor_abs:.1f}%</strong> "
+        "no período. Recomenda-se análise detalhada."
+    )
+    _TPL_ESTABILIDADE = (
+        "➡️ Vendas estáveis, com variação de <strong>{valor:.1f}%</strong>."
+    )
+    _TPL_CONCENTRACAO = (
+        "📊 <strong>{produtos} produtos</strong> da classe A representam "
+        "<strong>{concentracao:.1f}%</strong> da receita total."
+    )
+    _TPL_QUALIDADE_EXCELENTE = (
+        "✅ Excelente densidade de dados (<strong>{densidade:.1f}%</strong>), "
+        "cobrindo praticamente todo o período analisado."
+    )
+    _TPL_QUALIDADE_BOA = (
+        "✔️ Boa presença de dados ao longo do período "
+        "(<strong>{densidade:.1f}%</strong> de cobertura)."
+    )
+    _TPL_QUALIDADE_MEDIA = (
+        "⚠️ Cobertura mediana de dados (<strong>{densidade:.1f}%</strong>). "
+        "Algumas lacunas podem afetar análises de tendência."
+    )
+    _TPL_QUALIDADE_BAIXA = (
+        "⚠️ Baixa densidade de dados (<strong>{densidade:.1f}%</strong>). "
+        "Existem lacunas significativas que podem distorcer conclusões."
+    )
+    _TPL_DIA_PICO = (
+        "🔥 Dia com maior receita: <strong>{data}</strong>, "
+        "com <strong>R$ {receita:,.2f}</strong> em faturamento."
+    )
+    _TPL_TICKET_ALTO = (
+        "💰 Ticket médio alto de <strong>R$ {ticket:,.2f}</strong> "
+        "indica vendas de produtos premium."
+    )
+    _TPL_TICKET_MEDIO = (
+        "💵 Ticket médio de <strong>R$ {ticket:,.2f}</strong> "
+        "está em patamar saudável."
+    )
+    _TPL_TICKET_BAIXO = (
+        "💸 Ticket médio de <strong>R$ {ticket:,.2f}</strong>. "
+        "Considere estratégias de upsell."
+    )
+
+    # Faixas por limiar: o índice da faixa é quantos limites o valor supera
+    # estritamente (np.searchsorted com side="left"), e cada faixa aponta
+    # para (chave do insight, template). O limite inferior do crescimento é
+    # o float imediatamente abaixo de -5, para que exatamente -5% ainda
+    # conte como estabilidade.
+    _LIMITES_CRESCIMENTO = np.array([np.nextafter(-5.0, -np.inf), 5.0])
+    _FAIXAS_CRESCIMENTO = (
+        ("queda", _TPL_QUEDA),
+        ("estabilidade", _TPL_ESTABILIDADE),
+        ("crescimento", _TPL_CRESCIMENTO),
+    )
+    _LIMITES_QUALIDADE = np.array([60.0, 80.0, 95.0])
+    _FAIXAS_QUALIDADE = (
+        ("qualidade_baixa", _TPL_QUALIDADE_BAIXA),
+        ("qualidade_media", _TPL_QUALIDADE_MEDIA),
+        ("qualidade_boa", _TPL_QUALIDADE_BOA),
+        ("qualidade_excelente", _TPL_QUALIDADE_EXCELENTE),
+    )
+    _LIMITES_TICKET = np.array([200.0, 500.0])
+    _FAIXAS_TICKET = (
+        ("ticket_baixo", _TPL_TICKET_BAIXO),
+        ("ticket_medio", _TPL_TICKET_MEDIO),
+        ("ticket_alto", _TPL_TICKET_ALTO),
+    )
+
+    def _por_faixa(
+        self,
+        valor: float,
+        limites: np.ndarray,
+        faixas: Tuple[Tuple[str, str], ...],
+        campos: Dict[str, Any],
+    ) -> Tuple[str, str]:
+        """Escolhe (chave, mensagem) pela faixa em que o valor cai."""
+        chave, template = faixas[int(np.searchsorted(limites, valor, side="left"))]
+        return chave, template.format_map(campos)
+
+    def gerar(self, df: Optional[pd.DataFrame], estatisticas: Dict[str, Any]) -> Dict[str, str]:
         """
         Gera insights automáticos baseados nos dados e estatísticas.
         
         Args:
-            df: DataFrame limpo (usado se precisar calcular algo extra)
+            df: DataFrame limpo (opcional; nenhum insight atual o utiliza)
             estatisticas: Dicionário com estatísticas (estrutura achatada)
         
         Returns:
@@ -35,15 +145,12 @@ class InsightsVendas:
             
             if receita_total > 0:
                 participacao = (receita / receita_total) * 100
-                insights["produto_campeao"] = (
-                    f"🏆 <strong>{nome}</strong> é o produto campeão, "
-                    f"gerando <strong>R$ {receita:,.2f}</strong> "
-                    f"({participacao:.1f}% do faturamento total)."
+                insights["produto_campeao"] = self._TPL_PRODUTO_CAMPEAO.format_map(
+                    {"nome": nome, "receita": receita, "participacao": participacao}
                 )
             else:
-                insights["produto_campeao"] = (
-                    f"🏆 <strong>{nome}</strong> é o produto campeão, "
-                    f"gerando <strong>R$ {receita:,.2f}</strong>."
+                insights["produto_campeao"] = self._TPL_PRODUTO_CAMPEAO_SEM_GMV.format_map(
+                    {"nome": nome, "receita": receita}
                 )
 
         # ========== INSIGHT 2: Melhor Dia da Semana ==========
@@ -52,9 +159,8 @@ class InsightsVendas:
         
         if melhor_dia and receita_dia_semana:
             receita_melhor = receita_dia_semana.get(melhor_dia, 0)
-            insights["melhor_dia_semana"] = (
-                f"📅 <strong>{melhor_dia}</strong> é o melhor dia para vendas, "
-                f"com <strong>R$ {receita_melhor:,.2f}</strong> em receita acumulada."
+            insights["melhor_dia_semana"] = self._TPL_MELHOR_DIA.format_map(
+                {"dia": melhor_dia, "receita": receita_melhor}
             )
 
         # ========== INSIGHT 3: Melhor Mês ==========
@@ -65,102 +171,72 @@ class InsightsVendas:
             receita_mes = receita_mensal[melhor_mes]
             # Formatar mês (2024-01 -> Jan/2024)
             ano, mes = melhor_mes.split("-")
-            meses = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", 
-                    "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
-            mes_nome = meses[int(mes) - 1]
+            mes_nome = self.MESES[int(mes) - 1]
             
-            insights["melhor_mes"] = (
-                f"📆 O melhor mês foi <strong>{mes_nome}/{ano}</strong>, "
-                f"com <strong>R$ {receita_mes:,.2f}</strong> em faturamento."
+            insights["melhor_mes"] = self._TPL_MELHOR_MES.format_map(
+                {"mes": mes_nome, "ano": ano, "receita": receita_mes}
             )
 
         # ========== INSIGHT 4: Crescimento ==========
         crescimento = estatisticas.get("crescimento_percentual", 0)
         
-        if crescimento > 5:
-            insights["crescimento"] = (
-                f"📈 Crescimento positivo de <strong>{crescimento:.1f}%</strong> "
-                f"no período analisado!"
-            )
-        elif crescimento < -5:
-            insights["queda"] = (
-                f"📉 Atenção: queda de <strong>{abs(crescimento):.1f}%</strong> "
-                f"no período. Recomenda-se análise detalhada."
-            )
-        else:
-            insights["estabilidade"] = (
-                f"➡️ Vendas estáveis, com variação de <strong>{crescimento:.1f}%</strong>."
-            )
+        chave, texto = self._por_faixa(
+            crescimento,
+            self._LIMITES_CRESCIMENTO,
+            self._FAIXAS_CRESCIMENTO,
+            {"valor": crescimento, "valor_abs": abs(crescimento)},
+        )
+        insights[chave] = texto
 
         # ========== INSIGHT 5: Concentração (Curva ABC) ==========
         curva_abc = estatisticas.get("curva_abc", [])
         gmv = estatisticas.get("gmv", 0)
         
         if curva_abc and gmv > 0:
-            # Soma receita dos produtos classe A
-            receita_a = sum(receita for _, receita, classe in curva_abc if classe == "A")
+            # Soma e conta os produtos classe A em uma única passada
+            receita_a = 0
+            produtos_a = 0
+            for _, receita, classe in curva_abc:
+                if classe == "A":
+                    receita_a += receita
+                    produtos_a += 1
             concentracao = (receita_a / gmv) * 100
             
-            produtos_a = len([p for p, r, c in curva_abc if c == "A"])
-            
-            insights["concentracao"] = (
-                f"📊 <strong>{produtos_a} produtos</strong> da classe A representam "
-                f"<strong>{concentracao:.1f}%</strong> da receita total."
+            insights["concentracao"] = self._TPL_CONCENTRACAO.format_map(
+                {"produtos": produtos_a, "concentracao": concentracao}
             )
 
         # ========== INSIGHT 6: Qualidade Temporal ==========
         densidade = estatisticas.get("densidade_temporal_percent", 0)
         
-        if densidade > 95:
-            insights["qualidade_excelente"] = (
-                f"✅ Excelente densidade de dados (<strong>{densidade:.1f}%</strong>), "
-                f"cobrindo praticamente todo o período analisado."
-            )
-        elif densidade > 80:
-            insights["qualidade_boa"] = (
-                f"✔️ Boa presença de dados ao longo do período "
-                f"(<strong>{densidade:.1f}%</strong> de cobertura)."
-            )
-        elif densidade > 60:
-            insights["qualidade_media"] = (
-                f"⚠️ Cobertura mediana de dados (<strong>{densidade:.1f}%</strong>). "
-                f"Algumas lacunas podem afetar análises de tendência."
-            )
-        else:
-            insights["qualidade_baixa"] = (
-                f"⚠️ Baixa densidade de dados (<strong>{densidade:.1f}%</strong>). "
-                f"Existem lacunas significativas que podem distorcer conclusões."
-            )
+        chave, texto = self._por_faixa(
+            densidade,
+            self._LIMITES_QUALIDADE,
+            self._FAIXAS_QUALIDADE,
+            {"densidade": densidade},
+        )
+        insights[chave] = texto
 
         # ========== INSIGHT 7: Dia de Pico ==========
         top_dias = estatisticas.get("top_dias", [])
         
         if top_dias:
             data_pico, valor_pico = top_dias[0]
-            insights["dia_pico"] = (
-                f"🔥 Dia com maior receita: <strong>{data_pico}</strong>, "
-                f"com <strong>R$ {valor_pico:,.2f}</strong> em faturamento."
+            insights["dia_pico"] = self._TPL_DIA_PICO.format_map(
+                {"data": data_pico, "receita": valor_pico}
             )
 
         # ========== INSIGHT 8: Ticket Médio ==========
         ticket_medio = estatisticas.get("ticket_medio", 0)
         
         if ticket_medio > 0:
-            if ticket_medio > 500:
-                insights["ticket_alto"] = (
-                    f"💰 Ticket médio alto de <strong>R$ {ticket_medio:,.2f}</strong> "
-                    f"indica vendas de produtos premium."
-                )
-            elif ticket_medio > 200:
-                insights["ticket_medio"] = (
-                    f"💵 Ticket médio de <strong>R$ {ticket_medio:,.2f}</strong> "
-                    f"está em patamar saudável."
-                )
-            else:
-                insights["ticket_baixo"] = (
-                    f"💸 Ticket médio de <strong>R$ {ticket_medio:,.2f}</strong>. "
-                    f"Considere estratégias de upsell."
-                )
+            chave, texto = self._por_faixa(
+                ticket_medio,
+                self._LIMITES_TICKET,
+                self._FAIXAS_TICKET,
+                {"ticket": ticket_medio},
+            )
+            insights[chave] = texto
 
         return insights
 
@@ -189,7 +265,7 @@ if __name__ == "__main__":
     }
     
     gerador = InsightsVendas()
-    insights = gerador.gerar(pd.DataFrame(), stats_exemplo)
+    insights = gerador.gerar(None, stats_exemplo)
     
     print("🎯 INSIGHTS GERADOS:\n")
     for chave, texto in insights.items():
@@ -4,8 +4,22 @@ Responsável por ler o arquivo CSV e devolver um DataFrame.
 Segue o princípio da responsabilidade única (SRP).
 """
 
+from collections import OrderedDict
+
 import pandas as pd
 from pathlib import Path
+from typing import Any, Optional, Tuple
+
+try:
+    import pyarrow  # noqa: F401  (só para habilitar engine="pyarrow")
+    _PYARROW_DISPONIVEL = True
+except ImportError:
+    _PYARROW_DISPONIVEL = False
+
+
+# Cache LRU de DataFrames já lidos, indexado por (caminho, mtime, tamanho,
+# filtro). Se o arquivo for alterado, a chave muda e o CSV é lido de novo.
+_CACHE_CSV: "OrderedDict[Tuple[Any, ...], pd.DataFrame]" = OrderedDict()
 
 
 class CarregadorDados:
@@ -18,14 +32,27 @@ class CarregadorDados:
     - Mais reutilizável
     """
 
-    def __init__(self, caminho_arquivo: str):
+    # Linhas por bloco na leitura com filtro de datas
+    TAMANHO_BLOCO = 200_000
+
+    # Máximo de arquivos mantidos no cache de leitura
+    CACHE_MAXIMO = 8
+
+    def __init__(
+        self,
+        caminho_arquivo: str,
+        filtro_datas: Optional[Tuple[str, str]] = None,
+    ):
         """
         Inicializa o carregador com o caminho do arquivo
         
         Args:
             caminho_arquivo: Caminho para o arquivo CSV
+            filtro_datas: Intervalo (inicio, fim), inclusivo, para carregar
+                          só as vendas do período. Se None, carrega tudo.
         """
         self.caminho_arquivo = Path(caminho_arquivo)
+        self.filtro_datas = filtro_datas
 
     def validar_arquivo(self) -> bool:
         """
@@ -70,9 +97,23 @@ class CarregadorDados:
                 f"Arquivo inválido ou não encontrado: {self.caminho_arquivo}"
             )
         
+        # Reaproveita a leitura anterior se o arquivo não mudou
+        info = self.caminho_arquivo.stat()
+        chave = (
+            str(self.caminho_arquivo.resolve()),
+            info.st_mtime_ns,
+            info.st_size,
+            self.filtro_datas,
+        )
+        if chave in _CACHE_CSV:
+            _CACHE_CSV.move_to_end(chave)
+            df = _CACHE_CSV[chave].copy()
+            print(f"♻️ {len(df)} registros reaproveitados do cache (arquivo inalterado).")
+            return df
+
         # Tenta carregar o CSV
         try:
-            df = pd.read_csv(self.caminho_arquivo)
+            df = self._ler_csv()
         except pd.errors.EmptyDataError:
             raise ValueError("❌ O arquivo CSV está vazio!")
         except pd.errors.ParserError as e:
@@ -81,21 +122,83 @@ class CarregadorDados:
             # Tenta com encoding alternativo
             print("⚠️ Erro de encoding UTF-8, tentando com latin-1...")
             try:
-                df = pd.read_csv(self.caminho_arquivo, encoding='latin-1')
+                df = self._ler_csv(encoding='latin-1')
             except Exception as e:
                 raise ValueError(f"❌ Erro definitivo ao ler o arquivo: {e}")
         except Exception as e:
             raise ValueError(f"❌ Erro inesperado ao carregar: {e}")
         
         # Verifica se o DataFrame está vazio
+        if df.empty and self.filtro_datas is not None:
+            inicio, fim = self.filtro_datas
+            raise ValueError(f"❌ Nenhum registro encontrado entre {inicio} e {fim}!")
         if df.empty:
             raise ValueError("❌ O arquivo foi carregado, mas não contém dados!")
         
         print(f"✅ {len(df)} registros carregados com sucesso.")
         print(f"📋 Colunas encontradas: {list(df.columns)}")
+
+        # O cache guarda uma cópia própria: alterações no DataFrame
+        # devolvido não chegam aos acertos de cache seguintes
+        _CACHE_CSV[chave] = df.copy()
+        if len(_CACHE_CSV) > self.CACHE_MAXIMO:
+            _CACHE_CSV.popitem(last=False)
         
         return df
     
+    def _ler_csv(self, **opcoes) -> pd.DataFrame:
+        """
+        Lê o CSV com o motor pyarrow (colunar e multithread) quando
+        disponível, caindo para o motor C padrão se ele falhar.
+
+        O pyarrow não acusa UTF-8 inválido: devolve a coluna como bytes.
+        Nesse caso também relemos com o motor C, que levanta o
+        UnicodeDecodeError tratado em carregar().
+        """
+        if self.filtro_datas is not None:
+            return self._ler_csv_filtrado(**opcoes)
+
+        if _PYARROW_DISPONIVEL:
+            try:
+                df = pd.read_csv(self.caminho_arquivo, engine="pyarrow", **opcoes)
+            except Exception:
+                df = None
+
+            if df is not None and not self._tem_coluna_bytes(df):
+                return df
+
+        return pd.read_csv(self.caminho_arquivo, **opcoes)
+
+    def _ler_csv_filtrado(self, **opcoes) -> pd.DataFrame:
+        """
+        Lê o CSV em blocos e mantém só as linhas dentro de filtro_datas,
+        sem nunca materializar o arquivo inteiro em memória.
+
+        As linhas mantidas preservam os valores originais: a conversão
+        de tipos (e a contagem de inválidos) continua sendo da limpeza.
+        """
+        inicio, fim = (pd.Timestamp(d) for d in self.filtro_datas)
+
+        partes = []
+        for bloco in pd.read_csv(
+            self.caminho_arquivo, chunksize=self.TAMANHO_BLOCO, **opcoes
+        ):
+            if "data" not in bloco.columns:
+                raise ValueError("coluna 'data' ausente, não é possível filtrar por período")
+            datas = pd.to_datetime(bloco["data"], errors="coerce")
+            partes.append(bloco[datas.between(inicio, fim)])
+
+        return pd.concat(partes, ignore_index=True)
+
+    @staticmethod
+    def _tem_coluna_bytes(df: pd.DataFrame) -> bool:
+        """Indica se alguma coluna texto veio como bytes (encoding inválido)."""
+        for col in df.select_dtypes(include="object").columns:
+            primeiro = df[col].first_valid_index()
+            if primeiro is not None and isinstance(df[col].loc[primeiro], bytes):
+                return True
+        return False
+
     def info_arquivo(self) -> dict:
         """
         Retorna informações sobre o arquivo (útil para debug)
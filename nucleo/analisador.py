@@ -6,6 +6,7 @@ Versão: 2.0 (Com path relativo inteligente)
 """
 
 from pathlib import Path
+from typing import Optional, Tuple
 from dados.carregador import CarregadorDados
 from processamento.limpeza import LimpezaDados
 from processamento.estatisticas import EstatisticasVendas
@@ -19,13 +20,19 @@ class AnalisadorVendas:
     Classe que orquestra todo o pipeline de análise de vendas.
     """
 
-    def __init__(self, caminho_csv: str = None):
+    def __init__(
+        self,
+        caminho_csv: str = None,
+        filtro_datas: Optional[Tuple[str, str]] = None,
+    ):
         """
         Inicializa o analisador.
         
         Args:
             caminho_csv: Caminho para o arquivo CSV.
                         Se None, usa dados/dados_vendas.csv automaticamente.
+            filtro_datas: Intervalo (inicio, fim) opcional para analisar
+                          só parte do período (ex.: ("2024-01-01", "2024-03-31")).
         """
         if caminho_csv is None:
             # Encontra a pasta raiz do projeto (onde está este arquivo)
@@ -33,6 +40,7 @@ class AnalisadorVendas:
             caminho_csv = str(base_dir / "dados" / "dados_vendas.csv")
         
         self.caminho_csv = caminho_csv
+        self.filtro_datas = filtro_datas
 
     def executar(self):
         """Executa o pipeline completo de análise."""
@@ -41,7 +49,7 @@ class AnalisadorVendas:
         print("="*70 + "\n")
 
         # 1) Carregar
-        loader = CarregadorDados(self.caminho_csv)
+        loader = CarregadorDados(self.caminho_csv, filtro_datas=self.filtro_datas)
         df = loader.carregar()
 
         # 2) Limpar
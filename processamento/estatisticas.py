@@ -6,9 +6,137 @@ a partir dos dados já limpos.
 Versão: 2.0 (Estrutura padronizada e achatada)
 """
 
+import copy
+import re
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, List, Tuple
 
+try:
+    from numba import get_num_threads, njit, prange
+except ImportError:  # Numba é opcional: sem ela, usa-se o caminho NumPy
+    njit = None
+
+
+# ============================================================
+# Kernel de agregação
+# ============================================================
+
+def _reduzir_numpy(receita, quantidade, cod_produto, dia_semana, cod_mes,
+                   cod_data, n_produtos, n_meses, n_datas):
+    """Versão NumPy do kernel: um bincount por chave de agrupamento."""
+    # Código -1 (produto ausente) fica fora das somas por produto, como
+    # no groupby; as demais somas contam a linha normalmente
+    com_produto = cod_produto >= 0
+    if not com_produto.all():
+        receita_p, quantidade_p = receita[com_produto], quantidade[com_produto]
+        cod_p = cod_produto[com_produto]
+    else:
+        receita_p, quantidade_p, cod_p = receita, quantidade, cod_produto
+    return (
+        np.bincount(cod_p, weights=receita_p, minlength=n_produtos),
+        np.bincount(cod_p, weights=quantidade_p, minlength=n_produtos),
+        np.bincount(dia_semana, weights=receita, minlength=7),
+        np.bincount(cod_mes, weights=receita, minlength=n_meses),
+        np.bincount(cod_data, weights=receita, minlength=n_datas),
+    )
+
+
+# Assinaturas explícitas: com elas a Numba compila na importação (e, com
+# cache=True, só na primeira vez — depois carrega o binário de __pycache__),
+# em vez de pagar a compilação na primeira chamada de calcular().
+_ASSINATURA_REDUZIR = "(f8[::1], f8[::1], i8[::1], i8[::1], i8[::1], i8[::1], i8, i8, i8)"
+_ASSINATURA_PARALELO = _ASSINATURA_REDUZIR[:-1] + ", i8)"
+_ASSINATURA_RESUMIR = "(f8[::1], f8[::1], i8)"
+
+if njit is not None:
+    @njit(_ASSINATURA_REDUZIR, cache=True, fastmath=True, nogil=True)
+    def _reduzir_tudo(receita, quantidade, cod_produto, dia_semana, cod_mes,
+                      cod_data, n_produtos, n_meses, n_datas):
+        """Todas as somas agrupadas em uma única passada sobre as linhas."""
+        receita_produto = np.zeros(n_produtos)
+        unidades_produto = np.zeros(n_produtos)
+        receita_dia_semana = np.zeros(7)
+        receita_mes = np.zeros(n_meses)
+        receita_data = np.zeros(n_datas)
+        for i in range(receita.shape[0]):
+            r = receita[i]
+            p = cod_produto[i]
+            if p >= 0:  # -1 = produto ausente, fora das somas por produto
+                receita_produto[p] += r
+                unidades_produto[p] += quantidade[i]
+            receita_dia_semana[dia_semana[i]] += r
+            receita_mes[cod_mes[i]] += r
+            receita_data[cod_data[i]] += r
+        return (receita_produto, unidades_produto, receita_dia_semana,
+                receita_mes, receita_data)
+
+    @njit(_ASSINATURA_PARALELO, cache=True, fastmath=True, nogil=True, parallel=True)
+    def _reduzir_tudo_paralelo(receita, quantidade, cod_produto, dia_semana, cod_mes,
+                               cod_data, n_produtos, n_meses, n_datas, n_blocos):
+        """
+        Mesmo resultado de _reduzir_tudo, com as linhas divididas em
+        n_blocos (um por thread). Cada bloco acumula em sua própria linha
+        das matrizes (sem disputa de escrita) e as linhas são somadas no fim.
+        """
+        n = receita.shape[0]
+        tamanho = (n + n_blocos - 1) // n_blocos
+        receita_produto = np.zeros((n_blocos, n_produtos))
+        unidades_produto = np.zeros((n_blocos, n_produtos))
+        receita_dia_semana = np.zeros((n_blocos, 7))
+        receita_mes = np.zeros((n_blocos, n_meses))
+        receita_data = np.zeros((n_blocos, n_datas))
+        for b in prange(n_blocos):
+            for i in range(b * tamanho, min((b + 1) * tamanho, n)):
+                r = receita[i]
+                p = cod_produto[i]
+                if p >= 0:
+                    receita_produto[b, p] += r
+                    unidades_produto[b, p] += quantidade[i]
+                receita_dia_semana[b, dia_semana[i]] += r
+                receita_mes[b, cod_mes[i]] += r
+                receita_data[b, cod_data[i]] += r
+        return (receita_produto.sum(axis=0), unidades_produto.sum(axis=0),
+                receita_dia_semana.sum(axis=0), receita_mes.sum(axis=0),
+                receita_data.sum(axis=0))
+else:
+    _reduzir_tudo = _reduzir_numpy
+    _reduzir_tudo_paralelo = None
+
+
+def _resumir_periodo(receita_mes, receita_data, k):
+    """
+    A partir das somas já agregadas: índices do melhor e do pior mês
+    (-1 se não houver meses), crescimento percentual do primeiro ao
+    último mês e os índices dos k dias de maior receita, em ordem
+    decrescente (empates mantêm a ordem cronológica).
+    """
+    n_meses = receita_mes.shape[0]
+    idx_melhor = -1
+    idx_pior = -1
+    if n_meses > 0:
+        idx_melhor = int(np.argmax(receita_mes))
+        idx_pior = int(np.argmin(receita_mes))
+
+    crescimento = 0.0
+    if n_meses >= 2 and receita_mes[0] > 0:
+        crescimento = (receita_mes[n_meses - 1] - receita_mes[0]) / receita_mes[0] * 100.0
+
+    # Top-k por seleção parcial: só os k candidatos são ordenados
+    n_datas = receita_data.shape[0]
+    if n_datas > k:
+        candidatos = np.sort(np.argpartition(-receita_data, k - 1)[:k])
+    else:
+        candidatos = np.arange(n_datas)
+    ordem = np.argsort(-receita_data[candidatos], kind="mergesort")
+    return idx_melhor, idx_pior, crescimento, candidatos[ordem]
+
+
+if njit is not None:
+    _resumir_periodo = njit(_ASSINATURA_RESUMIR, cache=True)(_resumir_periodo)
+
 
 class EstatisticasVendas:
     """
@@ -42,6 +170,23 @@ class EstatisticasVendas:
 
     MARGEM_PADRAO = 0.25
 
+    # A partir deste número de linhas o kernel Numba paralelo compensa
+    # o custo de disparar as threads
+    LIMIAR_PARALELO = 100_000
+
+    # Regex compilada uma única vez: cada alternativa é um lookahead ancorado
+    # no início, então a primeira palavra-chave (na ordem do dicionário)
+    # presente no nome vence — mesma prioridade de _margem_produto.
+    _PADRAO_CATEGORIA = re.compile(
+        "^(?:" + "|".join(f"(?=.*({re.escape(p)}))" for p in MARGENS_CATEGORIA) + ")",
+        re.DOTALL,  # o .* atravessa quebras de linha, como o "in" escalar
+    )
+
+    # Cache compartilhado entre instâncias: reexecuções sobre os mesmos
+    # dados (ex.: sessões interativas) não recalculam tudo.
+    CACHE_MAXIMO = 8
+    _cache: "OrderedDict[Tuple[Any, ...], Dict[str, Any]]" = OrderedDict()
+
     def __init__(self) -> None:
         self.resultados: Dict[str, Any] = {}
 
@@ -64,24 +209,120 @@ class EstatisticasVendas:
         if faltando:
             raise ValueError(f"❌ DataFrame incompleto. Colunas faltando: {faltando}")
 
-        df = df.copy()
-
+        # Cópia só quando é preciso alterar: no caso comum (saída da
+        # limpeza) 'data' já é datetime sem NaT e o DataFrame é usado como está
         if not pd.api.types.is_datetime64_any_dtype(df["data"]):
+            df = df.copy()
             df["data"] = pd.to_datetime(df["data"], errors="coerce")
 
-        if df["data"].isna().any():
-            df = df[df["data"].notna()].copy()
+        validas = df["data"].notna()
+        if not validas.all():
+            df = df.loc[validas]
 
         return df
 
+    def _chave_cache(self, df: pd.DataFrame) -> Tuple[Any, ...]:
+        """
+        Impressão digital barata do DataFrame para memoização.
+
+        Usa todas as colunas que calcular() lê: a receita é recalculada
+        de valor * quantidade, então é 'valor' (não 'receita') que entra,
+        e ano, mes e dia_semana alimentam os agrupamentos de _agregar.
+        """
+        hash_linhas = pd.util.hash_pandas_object(
+            df[["data", "produto", "quantidade", "valor", "ano", "mes", "dia_semana"]],
+            index=False,
+        )
+        return (
+            df.shape[0],
+            int(hash_linhas.sum()),
+            float(df["valor"].sum()),
+        )
+
     def _margem_produto(self, nome_produto: str) -> float:
-        """Retorna a margem estimada para um produto."""
+        """Retorna a margem estimada para um produto (versão escalar)."""
         nome = str(nome_produto).lower()
         for palavra, margem in self.MARGENS_CATEGORIA.items():
             if palavra in nome:
                 return margem
         return self.MARGEM_PADRAO
 
+    def _margens_vetorizadas(self, produtos: pd.Series) -> np.ndarray:
+        """
+        Margem estimada por linha, sem laço Python por linha.
+
+        Recebe a coluna 'produto' categórica: a regex roda só sobre as
+        categorias e o resultado volta para as linhas pelos códigos.
+        """
+        nomes = pd.Series(produtos.cat.categories, dtype=object).astype(str).str.lower()
+        grupos = nomes.str.extract(self._PADRAO_CATEGORIA).notna().to_numpy()
+        margens_grupo = np.fromiter(self.MARGENS_CATEGORIA.values(), dtype=np.float64)
+        margens_unicas = np.where(
+            grupos.any(axis=1), margens_grupo[grupos.argmax(axis=1)], self.MARGEM_PADRAO
+        )
+        # Código -1 (produto ausente) cai na margem padrão anexada ao final
+        margens_unicas = np.append(margens_unicas, self.MARGEM_PADRAO)
+        return margens_unicas[produtos.cat.codes.to_numpy()]
+
+    def _agregar(
+        self, df: pd.DataFrame, produtos_cat: pd.Series, receita: np.ndarray
+    ) -> Tuple[pd.Series, pd.Series, np.ndarray, pd.Series, pd.Series]:
+        """
+        Codifica as chaves de agrupamento como inteiros e delega as somas
+        ao kernel de passada única. Devolve Series equivalentes aos
+        groupby(...).sum() por produto, (ano, mes) e data; o dia da semana
+        (0-6) já é índice direto e volta como array de 7 posições.
+        """
+        cod_produto = produtos_cat.cat.codes.to_numpy()
+        produtos = produtos_cat.cat.categories
+        cod_mes, meses = pd.factorize(
+            df["ano"].to_numpy(np.int64) * 100 + df["mes"].to_numpy(np.int64), sort=True
+        )
+        cod_data, datas = pd.factorize(df["data"], sort=True)
+
+        # dia_semana indexa direto o acumulador de 7 posições: fora de 0-6
+        # a Numba escreveria fora do array (sem checagem de limites)
+        dia_semana = df["dia_semana"].to_numpy(np.int64)
+        if dia_semana.size and (dia_semana.min() < 0 or dia_semana.max() > 6):
+            raise ValueError(
+                "❌ dia_semana deve estar entre 0 (segunda) e 6 (domingo); "
+                f"recebido de {dia_semana.min()} a {dia_semana.max()}"
+            )
+
+        # Arrays contíguos nos tipos exatos da assinatura do kernel
+        contiguo = np.ascontiguousarray
+        argumentos = (
+            contiguo(receita, dtype=np.float64),
+            contiguo(df["quantidade"].to_numpy(np.float64), dtype=np.float64),
+            contiguo(cod_produto, dtype=np.int64),
+            contiguo(dia_semana, dtype=np.int64),
+            contiguo(cod_mes, dtype=np.int64),
+            contiguo(cod_data, dtype=np.int64),
+            len(produtos),
+            len(meses),
+            len(datas),
+        )
+        if _reduzir_tudo_paralelo is not None and len(receita) > self.LIMIAR_PARALELO:
+            somas = _reduzir_tudo_paralelo(*argumentos, get_num_threads())
+        else:
+            somas = _reduzir_tudo(*argumentos)
+        receita_produto, unidades_produto, receita_dia_semana, receita_mes, receita_data = somas
+
+        indice_meses = pd.MultiIndex.from_arrays(
+            [meses // 100, meses % 100], names=["ano", "mes"]
+        )
+        return (
+            pd.Series(receita_produto, index=pd.Index(produtos, name="produto"), name="receita"),
+            pd.Series(
+                unidades_produto.astype(np.int64),
+                index=pd.Index(produtos, name="produto"),
+                name="quantidade",
+            ),
+            receita_dia_semana,
+            pd.Series(receita_mes, index=indice_meses, name="receita"),
+            pd.Series(receita_data, index=pd.DatetimeIndex(datas, name="data"), name="receita"),
+        )
+
     # ============================================================
     # Cálculos de Estatísticas
     # ============================================================
@@ -96,8 +337,30 @@ class EstatisticasVendas:
 
         df = self._validar_dataframe(df)
 
+        chave_cache = self._chave_cache(df)
+        if chave_cache in self._cache:
+            self._cache.move_to_end(chave_cache)
+            # Cópia profunda: listas e dicts do resultado não são
+            # compartilhados com o cache (nem entre chamadas)
+            self.resultados = copy.deepcopy(self._cache[chave_cache])
+            return self.resultados
+
+        # 'produto' categórico uma única vez: margens e agregações passam
+        # a trabalhar sobre códigos inteiros em vez de strings
+        if isinstance(df["produto"].dtype, pd.CategoricalDtype):
+            produtos_cat = df["produto"].cat.remove_unused_categories()
+        else:
+            produtos_cat = df["produto"].astype("category")
+
+        # receita = valor * quantidade recalculada uma vez em float64
+        # contíguo; o DataFrame recebido não é alterado
+        valor_arr = df["valor"].to_numpy(np.float64, copy=False)
+        quantidade_arr = df["quantidade"].to_numpy(np.float64, copy=False)
+        receita_arr = np.empty_like(valor_arr)
+        np.multiply(valor_arr, quantidade_arr, out=receita_arr)
+
         # ==================== FINANCEIRO ====================
-        receita_total = df["receita"].sum()
+        receita_total = receita_arr.sum()
         total_transacoes = len(df)
         total_unidades = df["quantidade"].sum()
 
@@ -105,38 +368,39 @@ class EstatisticasVendas:
             receita_total / total_transacoes if total_transacoes > 0 else 0
         )
 
-        receita_por_dia = df.groupby("data")["receita"].sum()
+        # Agregações por produto, dia da semana, mês e data em uma passada
+        (
+            receita_por_produto,
+            unidades_por_produto,
+            receita_por_dia_semana,
+            receita_mensal_group,
+            receita_por_dia,
+        ) = self._agregar(df, produtos_cat, receita_arr)
+
         receita_media_diaria = self._fmt(
             receita_por_dia.mean() if not receita_por_dia.empty else 0
         )
 
-        data_inicio = df["data"].min()
-        data_fim = df["data"].max()
+        # As datas únicas já saem ordenadas da fatoração em _agregar
+        data_inicio = receita_por_dia.index[0] if len(receita_por_dia) else pd.NaT
+        data_fim = receita_por_dia.index[-1] if len(receita_por_dia) else pd.NaT
         dias_analisados = (data_fim - data_inicio).days + 1 if not df.empty else 0
 
         # Lucro estimado
-        margens = df["produto"].apply(self._margem_produto)
-        lucro_estimado = (df["receita"] * margens).sum()
+        margens = self._margens_vetorizadas(produtos_cat)
+        lucro_estimado = float(np.dot(receita_arr, margens))
         margem_media = lucro_estimado / receita_total if receita_total > 0 else 0
 
         # ==================== PRODUTOS ====================
-        receita_por_produto = (
-            df.groupby("produto")["receita"]
-            .sum()
-            .sort_values(ascending=False)
-        )
-
-        unidades_por_produto = (
-            df.groupby("produto")["quantidade"]
-            .sum()
-            .sort_values(ascending=False)
-        )
+        receita_por_produto = receita_por_produto.sort_values(ascending=False)
+        unidades_por_produto = unidades_por_produto.sort_values(ascending=False)
 
         # Top produtos como LISTA DE TUPLAS (para HTML)
-        top_produtos: List[Tuple[str, float]] = [
-            (produto, self._fmt(valor))
-            for produto, valor in receita_por_produto.head(10).items()
-        ]
+        top10 = receita_por_produto.head(10)
+        top_produtos: List[Tuple[str, float]] = list(zip(
+            top10.index.tolist(),
+            np.round(top10.to_numpy(np.float64), 2).tolist(),
+        ))
 
         # Curva ABC
         curva = receita_por_produto.reset_index()
@@ -147,84 +411,63 @@ class EstatisticasVendas:
         )
         curva["participacao_acumulada"] = curva["participacao_percent"].cumsum()
 
-        def classifica_abc(valor_acumulado: float) -> str:
-            if valor_acumulado <= 80:
-                return "A"
-            elif valor_acumulado <= 95:
-                return "B"
-            return "C"
-
-        curva["classe_abc"] = curva["participacao_acumulada"].apply(classifica_abc)
+        # Classe ABC: A até 80% acumulado, B até 95%, C no restante
+        acumulada = curva["participacao_acumulada"].to_numpy()
+        curva["classe_abc"] = np.where(
+            acumulada <= 80, "A", np.where(acumulada <= 95, "B", "C")
+        ).astype(object)
 
         # Curva ABC como LISTA DE TUPLAS (produto, receita, classe)
-        curva_abc: List[Tuple[str, float, str]] = [
-            (row["produto"], self._fmt(row["receita"]), row["classe_abc"])
-            for _, row in curva.head(10).iterrows()
-        ]
+        topo_curva = curva.head(10)
+        curva_abc: List[Tuple[str, float, str]] = list(zip(
+            topo_curva["produto"].tolist(),
+            np.round(topo_curva["receita"].to_numpy(np.float64), 2).tolist(),
+            topo_curva["classe_abc"].tolist(),
+        ))
 
         # ==================== SAZONALIDADE ====================
         mapa_dias = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
 
-        receita_por_dia_semana = (
-            df.groupby("dia_semana")["receita"]
-            .sum()
-            .reindex(range(7), fill_value=0)
-        )
-
-        melhor_dia_idx = receita_por_dia_semana.idxmax()
+        melhor_dia_idx = int(receita_por_dia_semana.argmax())
         melhor_dia_nome = mapa_dias[melhor_dia_idx]
 
-        receita_dia_semana: Dict[str, float] = {
-            mapa_dias[i]: self._fmt(valor)
-            for i, valor in receita_por_dia_semana.items()
-        }
-
-        # Receita mensal
-        receita_mensal_group = (
-            df.groupby(["ano", "mes"])["receita"]
-            .sum()
-            .sort_index()
+        receita_dia_semana: Dict[str, float] = dict(
+            zip(mapa_dias, np.round(receita_por_dia_semana, 2).tolist())
         )
 
+        # Receita mensal
         receita_mensal: Dict[str, float] = {}
         for (ano, mes), valor in receita_mensal_group.items():
             chave = f"{ano}-{mes:02d}"
             receita_mensal[chave] = self._fmt(valor)
 
-        # Crescimento
-        if len(receita_mensal_group) >= 2:
-            primeiro = receita_mensal_group.iloc[0]
-            ultimo = receita_mensal_group.iloc[-1]
-            crescimento = (ultimo - primeiro) / primeiro * 100 if primeiro > 0 else 0
-        else:
-            crescimento = 0.0
+        # Crescimento, melhor/pior mês e top 10 dias
+        pos_melhor, pos_pior, crescimento, pos_top_dias = _resumir_periodo(
+            np.ascontiguousarray(receita_mensal_group.to_numpy(np.float64)),
+            np.ascontiguousarray(receita_por_dia.to_numpy(np.float64)),
+            10,
+        )
 
-        # Melhor/pior mês
-        if not receita_mensal_group.empty:
-            idx_melhor = receita_mensal_group.idxmax()
-            idx_pior = receita_mensal_group.idxmin()
+        if pos_melhor >= 0:
+            idx_melhor = receita_mensal_group.index[pos_melhor]
+            idx_pior = receita_mensal_group.index[pos_pior]
             melhor_mes = f"{idx_melhor[0]}-{idx_melhor[1]:02d}"
             pior_mes = f"{idx_pior[0]}-{idx_pior[1]:02d}"
         else:
             melhor_mes = None
             pior_mes = None
 
-        # Top 10 dias
-        receita_por_dia_full = (
-            df.groupby("data")["receita"]
-            .sum()
-            .sort_values(ascending=False)
-            .head(10)
-        )
+        receita_por_dia_full = receita_por_dia.iloc[pos_top_dias]
 
-        top_dias: List[Tuple[str, float]] = [
-            (data.strftime("%d/%m/%Y"), self._fmt(valor))
-            for data, valor in receita_por_dia_full.items()
-        ]
+        rotulos_dias = pd.DatetimeIndex(receita_por_dia_full.index).strftime("%d/%m/%Y")
+        top_dias: List[Tuple[str, float]] = list(zip(
+            rotulos_dias.tolist(),
+            np.round(receita_por_dia_full.to_numpy(np.float64), 2).tolist(),
+        ))
 
         # ==================== QUALIDADE TEMPORAL ====================
         dias_periodo = dias_analisados
-        dias_com_venda = df["data"].nunique()
+        dias_com_venda = len(receita_por_dia)
         densidade = (dias_com_venda / dias_periodo * 100) if dias_periodo > 0 else 0.0
 
         # ==================== RESULTADO ACHATADO ====================
@@ -260,6 +503,10 @@ class EstatisticasVendas:
             "densidade_temporal_percent": self._fmt(densidade),
         }
 
+        self._cache[chave_cache] = copy.deepcopy(self.resultados)
+        if len(self._cache) > self.CACHE_MAXIMO:
+            self._cache.popitem(last=False)
+
         return self.resultados
 
     def get_resultados(self) -> Dict[str, Any]:
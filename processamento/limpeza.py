@@ -6,8 +6,127 @@ Aplica validações e cria novas colunas úteis.
 Versão: 2.1 (Refatorada com melhorias)
 """
 
+import inspect
+import os
+import sys
+from functools import lru_cache, wraps
+
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba é opcional: sem ela, usa-se o caminho NumPy
+    njit = None
+
+
+# Tipos explícitos da tabela de categorias (evita a inferência do pandas)
+_DTYPES_CATEGORIAS = {
+    "produto": "object",
+    "categoria_sugerida": "object",
+    "margem_sugerida": "float64",
+}
+
+
+# ============================================================
+# Kernel de features derivadas
+# ============================================================
+
+def _preencher_features_numpy(valor, quantidade, posicoes,
+                              cal_ano, cal_mes, cal_dia_semana, cal_dia_mes, cal_semana,
+                              receita, ano, mes, dia_semana, dia_mes, semana):
+    """
+    Versão NumPy: receita = valor * quantidade e um take por feature da
+    tabela de calendário (indexada pelo dia relativo de cada linha).
+    Os resultados são escritos nos arrays de saída já alocados.
+    """
+    np.multiply(valor, quantidade, out=receita)
+    np.take(cal_ano, posicoes, out=ano)
+    np.take(cal_mes, posicoes, out=mes)
+    np.take(cal_dia_semana, posicoes, out=dia_semana)
+    np.take(cal_dia_mes, posicoes, out=dia_mes)
+    np.take(cal_semana, posicoes, out=semana)
+
+
+# Assinatura explícita: compila na importação (e, com cache=True, carrega
+# o binário de __pycache__ nas execuções seguintes)
+_ASSINATURA_FEATURES = (
+    "(f8[::1], f8[::1], i8[::1], "
+    "i4[::1], i4[::1], i4[::1], i4[::1], u4[::1], "
+    "f8[::1], i4[::1], i4[::1], i4[::1], i4[::1], u4[::1])"
+)
+
+if njit is not None:
+    @njit(_ASSINATURA_FEATURES, cache=True, nogil=True, parallel=True)
+    def _preencher_features(valor, quantidade, posicoes,
+                            cal_ano, cal_mes, cal_dia_semana, cal_dia_mes, cal_semana,
+                            receita, ano, mes, dia_semana, dia_mes, semana):
+        """Mesmo resultado da versão NumPy, numa única passada paralela."""
+        for i in prange(valor.shape[0]):
+            p = posicoes[i]
+            receita[i] = valor[i] * quantidade[i]
+            ano[i] = cal_ano[p]
+            mes[i] = cal_mes[p]
+            dia_semana[i] = cal_dia_semana[p]
+            dia_mes[i] = cal_dia_mes[p]
+            semana[i] = cal_semana[p]
+else:
+    _preencher_features = _preencher_features_numpy
+
+
+@lru_cache(maxsize=1)
+def _ler_categorias(caminho: str, mtime_ns: int, tamanho: int) -> pd.DataFrame:
+    # mtime/tamanho entram só na chave: se o arquivo mudar, ele é relido
+    return pd.read_csv(
+        caminho,
+        usecols=list(_DTYPES_CATEGORIAS),
+        dtype=_DTYPES_CATEGORIAS,
+    )
+
+
+def _carregar_categorias(caminho: str) -> pd.DataFrame:
+    """Lê a tabela de categorias uma vez e reaproveita enquanto o arquivo não mudar."""
+    info = os.stat(caminho)
+    return _ler_categorias(os.path.abspath(caminho), info.st_mtime_ns, info.st_size)
+
+
+# Mensagens das etapas que removem linhas ({removidos} + argumentos da etapa)
+_MSG_DUPLICATAS = "   🗑️ {removidos} duplicatas removidas"
+_MSG_INVALIDOS = "   🧹 {removidos} registros inválidos removidos"
+_MSG_OUTLIERS = "   📊 {removidos} outliers extremos removidos de '{coluna}'"
+
+
+def _etapa(chave: str, mensagem: str):
+    """
+    Decorator das etapas que removem linhas: compara df.shape[0] antes e
+    depois, grava a diferença em relatorio[chave] e registra a mensagem se
+    algo saiu. chave e mensagem podem usar os argumentos da etapa
+    (ex.: "{coluna}"). Se a etapa devolver o próprio df, ela não se
+    aplicou e nada é registrado.
+    """
+    def decorar(metodo):
+        # Nomes e defaults dos parâmetros após (self, df), lidos uma vez
+        # aqui: a cada chamada só se combinam com os argumentos recebidos
+        parametros = list(inspect.signature(metodo).parameters.values())[2:]
+        nomes = [p.name for p in parametros]
+        padroes = {p.name: p.default for p in parametros if p.default is not p.empty}
+
+        @wraps(metodo)
+        def executar(self, df, *args, **kwargs):
+            antes = df.shape[0]
+            resultado = metodo(self, df, *args, **kwargs)
+            if resultado is df:
+                return resultado
+
+            campos = dict(padroes)
+            campos.update(zip(nomes, args))
+            campos.update(kwargs)
+            self._registrar_remocao(chave, mensagem, antes - resultado.shape[0], **campos)
+            return resultado
+
+        return executar
+    return decorar
 
 
 class LimpezaDados:
@@ -26,6 +145,14 @@ class LimpezaDados:
 
     def __init__(self):
         self.relatorio: Dict[str, Any] = {}
+        # Durante limpar() as mensagens são acumuladas e escritas de uma vez
+        self._linhas_log: Optional[List[str]] = None
+
+    def _log(self, mensagem: str) -> None:
+        if self._linhas_log is None:
+            print(mensagem)
+        else:
+            self._linhas_log.append(mensagem)
 
     # -------------------------------------------------------------
     def validar_colunas(self, df: pd.DataFrame) -> None:
@@ -36,16 +163,9 @@ class LimpezaDados:
             )
 
     # -------------------------------------------------------------
+    @_etapa("duplicatas_removidas", _MSG_DUPLICATAS)
     def remover_duplicatas(self, df: pd.DataFrame) -> pd.DataFrame:
-        antes = len(df)
-        df = df.drop_duplicates()
-        removidas = antes - len(df)
-        self.relatorio["duplicatas_removidas"] = removidas
-
-        if removidas > 0:
-            print(f"   🗑️ {removidas} duplicatas removidas")
-
-        return df
+        return df.drop_duplicates()
 
     # -------------------------------------------------------------
     def converter_tipos(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -53,43 +173,84 @@ class LimpezaDados:
             "data": lambda x: pd.to_datetime(x, errors="coerce"),
             "valor": lambda x: pd.to_numeric(x, errors="coerce"),
             "quantidade": lambda x: pd.to_numeric(x, errors="coerce"),
+            # Poucos produtos distintos: como categoria, as etapas seguintes
+            # (máscara, lookup de categorias, agregações) trabalham sobre
+            # códigos inteiros em vez de refazer o hash de cada nome
+            "produto": lambda x: x.astype("category"),
         }
 
         invalidos_total = 0
+        convertidas = {}
 
         for coluna, funcao in conversoes.items():
             if coluna in df.columns:
                 antes = df[coluna].notna().sum()
-                df[coluna] = funcao(df[coluna])
-                depois = df[coluna].notna().sum()
+                convertidas[coluna] = funcao(df[coluna])
+                depois = convertidas[coluna].notna().sum()
                 invalidos = antes - depois
                 invalidos_total += invalidos
 
                 if invalidos > 0:
-                    print(f"   ⚠️ {invalidos} valores convertidos para NaN em '{coluna}'")
+                    self._log(f"   ⚠️ {invalidos} valores convertidos para NaN em '{coluna}'")
 
         self.relatorio["valores_invalidos_convertidos"] = invalidos_total
-        return df
+        # assign devolve um novo DataFrame: o recebido nunca é alterado
+        return df.assign(**convertidas)
 
     # -------------------------------------------------------------
-    def remover_registros_invalidos(self, df: pd.DataFrame) -> pd.DataFrame:
-        antes = len(df)
-
-        df = df.dropna(subset=self.COLUNAS_OBRIGATORIAS)
-        df = df[(df["valor"] > 0) & (df["quantidade"] > 0)]
-
-        df["valor"] = df["valor"].astype(float)
-        df["quantidade"] = df["quantidade"].astype(int)
-
-        removidos = antes - len(df)
-        self.relatorio["registros_invalidos"] = removidos
+    def _mascara_validos(self, df: pd.DataFrame) -> np.ndarray:
+        """Linhas sem nulos nas colunas obrigatórias e com valor/quantidade > 0."""
+        # Direto nos arrays NumPy: NaN > 0 já é False, então a comparação
+        # cobre os nulos de valor/quantidade; data e produto precisam de isna
+        mascara = (df["valor"].to_numpy() > 0) & (df["quantidade"].to_numpy() > 0)
+        mascara &= ~pd.isna(df["data"].to_numpy())
+        mascara &= ~df["produto"].isna().to_numpy()
+        return mascara
+
+    @staticmethod
+    def _limites_iqr(serie: pd.Series, limite_iqr: float) -> Tuple[float, float]:
+        # Q1 e Q3 numa única chamada: np.quantile faz uma só seleção parcial
+        # (introselect, O(N)) para os dois quartis, com a mesma interpolação
+        # linear de Series.quantile — os limites são idênticos
+        valores = serie.to_numpy(dtype=np.float64)
+        nulos = np.isnan(valores)
+        if nulos.any():
+            valores = valores[~nulos]
+        if len(valores) == 0:
+            return np.nan, np.nan
+        Q1, Q3 = np.quantile(valores, [0.25, 0.75])
+        IQR = Q3 - Q1
+        return Q1 - limite_iqr * IQR, Q3 + limite_iqr * IQR
 
+    @staticmethod
+    def _tipar_numericos(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        valor em float64 (valores monetários: float32 alteraria os totais do
+        relatório) e quantidade no menor inteiro que comporte o máximo —
+        int32 na prática, int64 só se algum valor não couber.
+        """
+        quantidade = df["quantidade"]
+        tipo_qtd = np.int32
+        if len(quantidade) and quantidade.max() > np.iinfo(np.int32).max:
+            tipo_qtd = np.int64
+        return df.assign(
+            valor=df["valor"].astype(float),
+            quantidade=quantidade.astype(tipo_qtd),
+        )
+
+    def _registrar_remocao(self, chave: str, mensagem: str, removidos: int, **campos) -> None:
+        self.relatorio[chave.format(**campos)] = removidos
         if removidos > 0:
-            print(f"   🧹 {removidos} registros inválidos removidos")
+            self._log(mensagem.format(removidos=removidos, **campos))
 
-        return df
+    # -------------------------------------------------------------
+    @_etapa("registros_invalidos", _MSG_INVALIDOS)
+    def remover_registros_invalidos(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.loc[self._mascara_validos(df)]
+        return self._tipar_numericos(df)
 
     # -------------------------------------------------------------
+    @_etapa("outliers_removidos_{coluna}", _MSG_OUTLIERS)
     def remover_outliers_extremos(
         self, df: pd.DataFrame, coluna: str = "valor", limite_iqr: int = 3
     ) -> pd.DataFrame:
@@ -97,35 +258,98 @@ class LimpezaDados:
         if coluna not in df.columns:
             return df
 
-        antes = len(df)
-
-        Q1 = df[coluna].quantile(0.25)
-        Q3 = df[coluna].quantile(0.75)
-        IQR = Q3 - Q1
-
-        limite_inferior = Q1 - limite_iqr * IQR
-        limite_superior = Q3 + limite_iqr * IQR
-
-        df = df[(df[coluna] >= limite_inferior) & (df[coluna] <= limite_superior)]
+        limite_inferior, limite_superior = self._limites_iqr(df[coluna], limite_iqr)
+        return df[(df[coluna] >= limite_inferior) & (df[coluna] <= limite_superior)]
 
-        removidos = antes - len(df)
-        self.relatorio["outliers_removidos_valor"] = removidos
-
-        if removidos > 0:
-            print(f"   📊 {removidos} outliers extremos removidos de '{coluna}'")
-
-        return df
+    # -------------------------------------------------------------
+    def filtrar_registros(self, df: pd.DataFrame, limite_iqr: int = 3) -> pd.DataFrame:
+        """
+        Equivale a remover_registros_invalidos + remover_outliers_extremos
+        ("valor"), mas monta uma única máscara booleana e materializa o
+        DataFrame filtrado uma vez só, em vez de um intermediário por etapa.
+        """
+        validos = self._mascara_validos(df)
+        self._registrar_remocao("registros_invalidos", _MSG_INVALIDOS, int((~validos).sum()))
+
+        valor = df["valor"]
+        limite_inferior, limite_superior = self._limites_iqr(valor[validos], limite_iqr)
+        mascara = validos & (valor >= limite_inferior) & (valor <= limite_superior)
+        self._registrar_remocao(
+            "outliers_removidos_{coluna}", _MSG_OUTLIERS,
+            int(validos.sum() - mascara.sum()), coluna="valor",
+        )
+
+        df = df.loc[mascara]
+        if isinstance(df["produto"].dtype, pd.CategoricalDtype):
+            df = df.assign(produto=df["produto"].cat.remove_unused_categories())
+        return self._tipar_numericos(df)
 
     # -------------------------------------------------------------
+    @staticmethod
+    def _features_derivadas(df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        receita, ano, mês, dia da semana, dia do mês e semana ISO.
+
+        Vendas cobrem poucos dias distintos em relação ao nº de linhas: as
+        features de data são calculadas uma vez por dia do intervalo
+        [mín, máx] e distribuídas às linhas pelo deslocamento inteiro em
+        dias. Essa distribuição e a receita saem de uma única passada
+        (kernel Numba, se disponível), em vez de cinco accessors .dt e
+        uma multiplicação sobre N linhas.
+        """
+        datas = df["data"]
+        indice = df.index
+        dias = datas.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+        if not (len(dias) and dias.max() - dias.min() < len(dias)):
+            calendario = datas.dt
+            return {
+                "receita": df["valor"] * df["quantidade"],
+                "ano": calendario.year,
+                "mes": calendario.month,
+                "dia_semana": calendario.dayofweek,
+                "dia_mes": calendario.day,
+                "semana_ano": calendario.isocalendar().week,
+            }
+
+        primeiro = dias.min()
+        calendario = pd.Series(
+            np.arange(primeiro, dias.max() + 1).astype("datetime64[D]").astype("datetime64[ns]")
+        ).dt
+        tabelas = (
+            calendario.year.to_numpy(np.int32),
+            calendario.month.to_numpy(np.int32),
+            calendario.dayofweek.to_numpy(np.int32),
+            calendario.day.to_numpy(np.int32),
+            calendario.isocalendar().week.to_numpy(np.uint32),
+        )
+
+        n = len(dias)
+        receita = np.empty(n, dtype=np.float64)
+        ano, mes, dia_semana, dia_mes = (np.empty(n, dtype=np.int32) for _ in range(4))
+        semana = np.empty(n, dtype=np.uint32)
+        contiguo = np.ascontiguousarray
+        _preencher_features(
+            contiguo(df["valor"].to_numpy(np.float64)),
+            contiguo(df["quantidade"].to_numpy(np.float64)),
+            dias - primeiro,
+            *tabelas,
+            receita, ano, mes, dia_semana, dia_mes, semana,
+        )
+
+        return {
+            "receita": pd.Series(receita, index=indice),
+            "ano": pd.Series(ano, index=indice),
+            "mes": pd.Series(mes, index=indice),
+            "dia_semana": pd.Series(dia_semana, index=indice),
+            "dia_mes": pd.Series(dia_mes, index=indice),
+            "semana_ano": pd.Series(semana, index=indice, dtype="UInt32"),
+        }
+
     def criar_features_derivadas(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["receita"] = df["valor"] * df["quantidade"]
-        df["ano"] = df["data"].dt.year
-        df["mes"] = df["data"].dt.month
-        df["dia_semana"] = df["data"].dt.dayofweek
-        df["dia_mes"] = df["data"].dt.day
-        df["semana_ano"] = df["data"].dt.isocalendar().week
-
-        print("   ✨ Features derivadas criadas")
+        df = df.assign(**self._features_derivadas(df))
+
+        self._log("   ✨ Features derivadas criadas")
         return df
 
     # -------------------------------------------------------------
@@ -135,29 +359,52 @@ class LimpezaDados:
         adicionando colunas: categoria, margem e lucro.
         """
         try:
-            categorias = pd.read_csv("dados/categorias_produtos.csv")
+            # Só as colunas usadas no lookup, em cache entre chamadas
+            # (não modificar: o mesmo DataFrame é devolvido de novo)
+            categorias = _carregar_categorias("dados/categorias_produtos.csv")
         except FileNotFoundError:
-            print("⚠️ Arquivo de categorias não encontrado! Ignorando categorização...")
-            df["categoria"] = "Outros"
-            df["margem"] = 0.20  # margem genérica
-            df["lucro"] = (df["receita"] * df["margem"]).round(2)
-            return df
+            self._log("⚠️ Arquivo de categorias não encontrado! Ignorando categorização...")
+            return df.assign(
+                categoria="Outros",
+                margem=0.20,  # margem genérica
+                lucro=(df["receita"] * 0.20).round(2),
+            )
 
-        # Merge
-        df = df.merge(categorias, on="produto", how="left")
+        # Lookup em vez de merge: a tabela tem uma linha por produto, então
+        # basta localizar a posição de cada produto uma vez (um único hash
+        # por linha) e puxar categoria e margem por essa posição — sem
+        # recopiar o DataFrame inteiro no resultado do join.
+        tabela = categorias.drop_duplicates("produto")
+        indice_tabela = pd.Index(tabela["produto"])
+        produtos = df["produto"]
+        if isinstance(produtos.dtype, pd.CategoricalDtype):
+            # Localiza cada produto distinto uma vez e espalha pelos códigos
+            # (o -1 extra no fim atende o código -1 de valores ausentes)
+            por_categoria = indice_tabela.get_indexer(produtos.cat.categories)
+            posicoes = np.append(por_categoria, -1)[produtos.cat.codes.to_numpy()]
+        else:
+            posicoes = indice_tabela.get_indexer(produtos)
+        categoria = pd.Series(
+            tabela["categoria_sugerida"].array.take(posicoes, allow_fill=True),
+            index=df.index,
+        )
+        margem = pd.Series(
+            tabela["margem_sugerida"].array.take(posicoes, allow_fill=True),
+            index=df.index,
+        )
 
         # Contar produtos não encontrados no CSV
-        sem_cat = df["categoria_sugerida"].isna().sum()
+        sem_cat = categoria.isna().sum()
         if sem_cat > 0:
-            print(f"⚠️ {sem_cat} produtos sem categoria → aplicando 'Outros'")
+            self._log(f"⚠️ {sem_cat} produtos sem categoria → aplicando 'Outros'")
 
         # Ajustar campos finais
-        df["categoria"] = df["categoria_sugerida"].fillna("Outros")
-        df["margem"] = df["margem_sugerida"].fillna(0.20)
-        df["lucro"] = (df["receita"] * df["margem"]).round(2)
-
-        # Remover colunas auxiliares
-        df = df.drop(columns=["categoria_sugerida", "margem_sugerida"])
+        margem = margem.fillna(0.20)
+        df = df.assign(
+            categoria=categoria.fillna("Outros"),
+            margem=margem,
+            lucro=(df["receita"] * margem).round(2),
+        )
 
         # Atualizar relatório
         self.relatorio["produtos_sem_categoria"] = sem_cat
@@ -167,34 +414,43 @@ class LimpezaDados:
     # -------------------------------------------------------------
     def ordenar_dados(self, df: pd.DataFrame) -> pd.DataFrame:
         df = df.sort_values("data").reset_index(drop=True)
-        print("   📅 Dados ordenados cronologicamente")
+        self._log("   📅 Dados ordenados cronologicamente")
         return df
 
     # -------------------------------------------------------------
     def limpar(self, df: pd.DataFrame) -> pd.DataFrame:
-        print("\n🧹 Limpando e validando dados...")
-
-        df = df.copy()  # *Uma vez só*
-        inicial = len(df)
+        self._linhas_log = []
+        try:
+            return self._limpar(df)
+        finally:
+            # Uma única escrita no stdout com todo o log (mesmo se algo falhar)
+            linhas, self._linhas_log = self._linhas_log, None
+            sys.stdout.write("".join(linha + "\n" for linha in linhas))
+
+    def _limpar(self, df: pd.DataFrame) -> pd.DataFrame:
+        self._log("\n🧹 Limpando e validando dados...")
+
+        # Sem cópia inicial: cada etapa devolve um DataFrame novo
+        # (drop_duplicates, assign, loc), então o df recebido não é alterado
+        inicial = df.shape[0]
         self.relatorio["registros_iniciais"] = inicial
 
         # Pipeline
         self.validar_colunas(df)
         df = self.remover_duplicatas(df)
         df = self.converter_tipos(df)
-        df = self.remover_registros_invalidos(df)
-        df = self.remover_outliers_extremos(df, "valor", limite_iqr=3)
+        df = self.filtrar_registros(df, limite_iqr=3)
         df = self.criar_features_derivadas(df)
         df = self.aplicar_categorias(df)
         df = self.ordenar_dados(df)
 
-        final = len(df)
+        final = df.shape[0]
         self.relatorio["registros_finais"] = final
         self.relatorio["taxa_aproveitamento"] = round((final / inicial) * 100, 2)
 
-        print(f"\n✅ Limpeza concluída:")
-        print(f"   📉 Registros removidos: {inicial-final} ({self.relatorio['taxa_aproveitamento']}% aproveitamento)")
-        print(f"   📈 Registros finais limpos: {final}")
+        self._log(f"\n✅ Limpeza concluída:")
+        self._log(f"   📉 Registros removidos: {inicial-final} ({self.relatorio['taxa_aproveitamento']}% aproveitamento)")
+        self._log(f"   📈 Registros finais limpos: {final}")
 
         return df
 
@@ -6,12 +6,39 @@ em um relatório executivo pronto para portfólio.
 Versão: 2.0 (Adaptado para estrutura achatada)
 """
 
+from functools import lru_cache
 from pathlib import Path
+from string import Template
 from typing import Dict, Any
 import datetime as dt
 import pandas as pd
 
 
+# "1,234.56" → "1.234,56" numa única passada
+_TRADUCAO_MOEDA = str.maketrans(",.", ".,")
+
+
+# Linhas das tabelas Top N (str.format sobre tuplas já formatadas)
+_LINHA_VALOR = "<tr><td>{}</td><td style='text-align: right;'>{}</td></tr>"
+_LINHA_ABC = (
+    "<tr><td>{}</td><td style='text-align: right;'>{}</td>"
+    "<td style='text-align: center;'><span class='tag tag-{}'>{}</span></td></tr>"
+)
+_SEM_DADOS_2 = "<tr><td colspan='2'>Sem dados</td></tr>"
+_SEM_DADOS_3 = "<tr><td colspan='3'>Sem dados</td></tr>"
+
+
+@lru_cache(maxsize=4096)
+def _moeda_br(valor: float) -> str:
+    return "R$ " + f"{valor:,.2f}".translate(_TRADUCAO_MOEDA)
+
+
+def _img_grafico(caminho: str, alt: str, indisponivel: str = "Gráfico não disponível") -> str:
+    if caminho:
+        return f"<img src='{caminho}' class='grafico' alt='{alt}'>"
+    return f"<p style='color: #6b7280; margin-top: 12px;'>{indisponivel}</p>"
+
+
 class GeradorRelatorioHTML:
     """
     Gera um relatório HTML único em output/relatorio_vendas.html
@@ -27,9 +54,12 @@ class GeradorRelatorioHTML:
         """Formata valor como moeda brasileira"""
         try:
             val = float(valor)
-            return f"R$ {val:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
         except Exception:
             return "R$ 0,00"
+        if val == 0:
+            # 0.0 e -0.0 são a mesma chave no cache, mas formatam diferente
+            return "R$ " + f"{val:,.2f}".translate(_TRADUCAO_MOEDA)
+        return _moeda_br(val)
 
     def _fmt_numero(self, valor: Any, casas: int = 2) -> str:
         """Formata número com casas decimais"""
@@ -62,12 +92,14 @@ class GeradorRelatorioHTML:
         
         # ========== Extração de Dados (estrutura achatada) ==========
         
+        fmt = self._fmt_moeda
+
         # Financeiro
-        gmv = self._fmt_moeda(estatisticas.get("gmv", 0))
-        lucro = self._fmt_moeda(estatisticas.get("lucro_estimado", 0))
+        gmv = fmt(estatisticas.get("gmv", 0))
+        lucro = fmt(estatisticas.get("lucro_estimado", 0))
         margem = self._fmt_numero(estatisticas.get("margem_media_percent", 0), 1) + "%"
-        ticket = self._fmt_moeda(estatisticas.get("ticket_medio", 0))
-        receita_media_dia = self._fmt_moeda(estatisticas.get("receita_media_diaria", 0))
+        ticket = fmt(estatisticas.get("ticket_medio", 0))
+        receita_media_dia = fmt(estatisticas.get("receita_media_diaria", 0))
         total_transacoes = int(estatisticas.get("total_transacoes", 0))
         total_unidades = int(estatisticas.get("total_unidades", 0))
         
@@ -90,6 +122,18 @@ class GeradorRelatorioHTML:
         # Top dias (já vem como lista de tuplas)
         top_dias = estatisticas.get("top_dias", [])[:5]
 
+        # Linhas das tabelas montadas uma vez, fora do template
+        linhas_top_produtos = "".join(
+            [_LINHA_VALOR.format(produto, fmt(receita)) for produto, receita in top_produtos]
+        ) if top_produtos else _SEM_DADOS_2
+        linhas_curva_abc = "".join(
+            [_LINHA_ABC.format(produto, fmt(receita), classe.lower(), classe)
+             for produto, receita, classe in curva_abc]
+        ) if curva_abc else _SEM_DADOS_3
+        linhas_top_dias = "".join(
+            [_LINHA_VALOR.format(data, fmt(receita)) for data, receita in top_dias]
+        ) if top_dias else _SEM_DADOS_2
+
         # Insights em HTML
         insights_html = ""
         if insights:
@@ -98,34 +142,74 @@ class GeradorRelatorioHTML:
             insights_html = "<li>Nenhum insight calculado.</li>"
 
         # Gráficos (caminhos relativos)
-        g_receita_diaria = caminhos_graficos.get("receita_diaria", "")
-        g_receita_mensal = caminhos_graficos.get("receita_mensal", "")
-        g_receita_semana = caminhos_graficos.get("receita_dia_semana", "")
-        g_ticket = caminhos_graficos.get("distribuicao_ticket", "")
-        g_ticket_seaborn = caminhos_graficos.get("distribuicao_ticket_seaborn", "")
-        g_heatmap = caminhos_graficos.get("heatmap_mes_semana", "")
+        img_receita_diaria = _img_grafico(caminhos_graficos.get("receita_diaria", ""), "Receita diária")
+        img_receita_mensal = _img_grafico(caminhos_graficos.get("receita_mensal", ""), "Receita mensal")
+        img_receita_semana = _img_grafico(caminhos_graficos.get("receita_dia_semana", ""), "Receita semanal")
+        img_ticket = _img_grafico(caminhos_graficos.get("distribuicao_ticket", ""), "Distribuição ticket")
+        img_ticket_seaborn = _img_grafico(caminhos_graficos.get("distribuicao_ticket_seaborn", ""), "Distribuição Ticket Seaborn")
+        img_heatmap = _img_grafico(caminhos_graficos.get("heatmap_mes_semana", ""), "Heatmap", "Heatmap não disponível")
 
         # Data de geração
         gerado_em = dt.datetime.now().strftime("%d/%m/%Y às %H:%M")
 
         # ========== Template HTML ==========
+
+        html = _TEMPLATE_HTML.substitute(
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            dias_analisados=dias_analisados,
+            gerado_em=gerado_em,
+            gmv=gmv,
+            lucro=lucro,
+            margem=margem,
+            ticket=ticket,
+            receita_media_dia=receita_media_dia,
+            total_transacoes=f"{total_transacoes:,}",
+            total_unidades=f"{total_unidades:,}",
+            dias_com_venda=dias_com_venda,
+            dias_periodo=dias_periodo,
+            densidade=densidade,
+            linhas_top_produtos=linhas_top_produtos,
+            linhas_curva_abc=linhas_curva_abc,
+            img_receita_diaria=img_receita_diaria,
+            img_receita_mensal=img_receita_mensal,
+            img_receita_semana=img_receita_semana,
+            img_ticket=img_ticket,
+            img_ticket_seaborn=img_ticket_seaborn,
+            img_heatmap=img_heatmap,
+            linhas_top_dias=linhas_top_dias,
+            insights_html=insights_html,
+        )
+
+        # Salva o arquivo (codifica uma vez e grava os bytes direto)
+        self.caminho_saida.write_bytes(html.encode("utf-8"))
+
+        print(f"\n✅ Relatório HTML gerado: {self.caminho_saida}")
+        print(f"📂 Abra no navegador: file:///{self.caminho_saida.absolute()}\n")
         
-        html = f"""<!DOCTYPE html>
+        return self.caminho_saida
+
+
+# ==================== Template ==================== #
+
+# Esqueleto do relatório, compilado uma única vez na importação.
+# Placeholders no formato ${nome}; um "$" literal precisa ser "$$".
+_TEMPLATE_HTML = Template("""<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
-    <title>Relatório de Vendas - {data_inicio} a {data_fim}</title>
+    <title>Relatório de Vendas - ${data_inicio} a ${data_fim}</title>
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{
+        * { box-sizing: border-box; margin: 0; padding: 0; }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
             background: #0f172a;
             color: #e5e7eb;
             padding: 30px;
             line-height: 1.6;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background: #020617;
@@ -133,22 +217,22 @@ class GeradorRelatorioHTML:
             padding: 40px;
             box-shadow: 0 25px 60px rgba(0,0,0,0.6);
             border: 1px solid #1f2937;
-        }}
-        header {{
+        }
+        header {
             border-bottom: 1px solid #1f2937;
             padding-bottom: 20px;
             margin-bottom: 30px;
-        }}
-        h1 {{
+        }
+        h1 {
             font-size: 2.2rem;
             color: #e5e7eb;
             margin-bottom: 10px;
-        }}
-        .subtitle {{
+        }
+        .subtitle {
             color: #9ca3af;
             font-size: 0.95rem;
-        }}
-        .badge {{
+        }
+        .badge {
             display: inline-block;
             background: linear-gradient(135deg, #22c55e, #16a34a);
             color: #022c22;
@@ -157,109 +241,109 @@ class GeradorRelatorioHTML:
             font-size: 0.8rem;
             font-weight: 600;
             margin-left: 8px;
-        }}
-        .grid {{
+        }
+        .grid {
             display: grid;
             gap: 20px;
             margin: 30px 0;
-        }}
-        .grid-3 {{
+        }
+        .grid-3 {
             grid-template-columns: repeat(auto-fit, minmax(240px, 1fr));
-        }}
-        .grid-2 {{
+        }
+        .grid-2 {
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-        }}
-        .card {{
+        }
+        .card {
             background: #020617;
             border-radius: 14px;
             padding: 20px;
             border: 1px solid #1f2937;
             transition: border-color 0.3s;
-        }}
-        .card:hover {{
+        }
+        .card:hover {
             border-color: #374151;
-        }}
-        .card-kpi {{
+        }
+        .card-kpi {
             background: radial-gradient(circle at top left, #22c55e22, #020617);
-        }}
-        .card h2 {{
+        }
+        .card h2 {
             font-size: 0.95rem;
             color: #9ca3af;
             margin-bottom: 8px;
             font-weight: 500;
-        }}
-        .card .valor {{
+        }
+        .card .valor {
             font-size: 1.8rem;
             font-weight: 600;
             color: #e5e7eb;
             margin-bottom: 4px;
-        }}
-        .card small {{
+        }
+        .card small {
             color: #6b7280;
             font-size: 0.85rem;
-        }}
-        section {{
+        }
+        section {
             margin-top: 40px;
-        }}
-        section h2.title {{
+        }
+        section h2.title {
             font-size: 1.5rem;
             margin-bottom: 20px;
             color: #e5e7eb;
             font-weight: 600;
-        }}
-        img.grafico {{
+        }
+        img.grafico {
             width: 100%;
             border-radius: 12px;
             margin-top: 12px;
             border: 1px solid #1f2937;
-        }}
-        ul {{
+        }
+        ul {
             list-style: disc;
             padding-left: 24px;
-        }}
-        li {{
+        }
+        li {
             margin-bottom: 10px;
             color: #d1d5db;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 12px;
-        }}
-        th, td {{
+        }
+        th, td {
             border-bottom: 1px solid #1f2937;
             padding: 10px 8px;
             font-size: 0.9rem;
             text-align: left;
-        }}
-        th {{
+        }
+        th {
             color: #9ca3af;
             font-weight: 600;
-        }}
-        td {{
+        }
+        td {
             color: #d1d5db;
-        }}
-        tr:hover td {{
+        }
+        tr:hover td {
             background: #1f2937;
-        }}
-        footer {{
+        }
+        footer {
             margin-top: 40px;
             padding-top: 20px;
             border-top: 1px solid #1f2937;
             color: #6b7280;
             font-size: 0.9rem;
             text-align: center;
-        }}
-        .tag {{
+        }
+        .tag {
             display: inline-block;
             padding: 3px 10px;
             border-radius: 999px;
             font-size: 0.75rem;
             font-weight: 600;
-        }}
-        .tag-a {{ background: #22c55e33; color: #22c55e; }}
-        .tag-b {{ background: #facc1533; color: #facc15; }}
-        .tag-c {{ background: #fb923c33; color: #fb923c; }}
+        }
+        .tag-a { background: #22c55e33; color: #22c55e; }
+        .tag-b { background: #facc1533; color: #facc15; }
+        .tag-c { background: #fb923c33; color: #fb923c; }
     </style>
 </head>
 <body>
@@ -267,11 +351,11 @@ class GeradorRelatorioHTML:
     <header>
         <h1>📊 Relatório de Vendas</h1>
         <p class="subtitle">
-            Período: <strong>{data_inicio}</strong> até <strong>{data_fim}</strong>
-            <span class="badge">{dias_analisados} dias</span>
+            Período: <strong>${data_inicio}</strong> até <strong>${data_fim}</strong>
+            <span class="badge">${dias_analisados} dias</span>
         </p>
         <p class="subtitle" style="margin-top:6px;">
-            Gerado em {gerado_em}
+            Gerado em ${gerado_em}
         </p>
     </header>
 
@@ -280,33 +364,33 @@ class GeradorRelatorioHTML:
         <div class="grid grid-3">
             <div class="card card-kpi">
                 <h2>GMV (Faturamento Bruto)</h2>
-                <div class="valor">{gmv}</div>
+                <div class="valor">${gmv}</div>
                 <small>Receita total no período</small>
             </div>
             <div class="card card-kpi">
                 <h2>Lucro Estimado</h2>
-                <div class="valor">{lucro}</div>
+                <div class="valor">${lucro}</div>
                 <small>Baseado em margens por categoria</small>
             </div>
             <div class="card card-kpi">
                 <h2>Margem Média</h2>
-                <div class="valor">{margem}</div>
+                <div class="valor">${margem}</div>
                 <small>Lucro / GMV</small>
             </div>
             <div class="card">
                 <h2>Ticket Médio</h2>
-                <div class="valor">{ticket}</div>
+                <div class="valor">${ticket}</div>
                 <small>Receita média por transação</small>
             </div>
             <div class="card">
                 <h2>Receita Média Diária</h2>
-                <div class="valor">{receita_media_dia}</div>
-                <small>Média em {dias_analisados} dias</small>
+                <div class="valor">${receita_media_dia}</div>
+                <small>Média em ${dias_analisados} dias</small>
             </div>
             <div class="card">
                 <h2>Volume</h2>
-                <div class="valor">{total_transacoes:,}</div>
-                <small>{total_unidades:,} unidades vendidas</small>
+                <div class="valor">${total_transacoes}</div>
+                <small>${total_unidades} unidades vendidas</small>
             </div>
         </div>
     </section>
@@ -316,17 +400,17 @@ class GeradorRelatorioHTML:
         <div class="grid grid-3">
             <div class="card">
                 <h2>Dias com Vendas</h2>
-                <div class="valor">{dias_com_venda}</div>
+                <div class="valor">${dias_com_venda}</div>
                 <small>Dias com pelo menos 1 transação</small>
             </div>
             <div class="card">
                 <h2>Dias no Período</h2>
-                <div class="valor">{dias_periodo}</div>
+                <div class="valor">${dias_periodo}</div>
                 <small>Total de dias analisados</small>
             </div>
             <div class="card">
                 <h2>Densidade Temporal</h2>
-                <div class="valor">{densidade}</div>
+                <div class="valor">${densidade}</div>
                 <small>Quanto mais próximo de 100%, melhor</small>
             </div>
         </div>
@@ -345,10 +429,7 @@ class GeradorRelatorioHTML:
                         </tr>
                     </thead>
                     <tbody>
-                        {"".join(
-                            f"<tr><td>{produto}</td><td style='text-align: right;'>{self._fmt_moeda(receita)}</td></tr>"
-                            for produto, receita in top_produtos
-                        ) if top_produtos else "<tr><td colspan='2'>Sem dados</td></tr>"}
+                        ${linhas_top_produtos}
                     </tbody>
                 </table>
             </div>
@@ -363,11 +444,7 @@ class GeradorRelatorioHTML:
                         </tr>
                     </thead>
                     <tbody>
-                        {"".join(
-                            f"<tr><td>{produto}</td><td style='text-align: right;'>{self._fmt_moeda(receita)}</td>"
-                            f"<td style='text-align: center;'><span class='tag tag-{classe.lower()}'>{classe}</span></td></tr>"
-                            for produto, receita, classe in curva_abc
-                        ) if curva_abc else "<tr><td colspan='3'>Sem dados</td></tr>"}
+                        ${linhas_curva_abc}
                     </tbody>
                 </table>
             </div>
@@ -379,30 +456,30 @@ class GeradorRelatorioHTML:
         <div class="grid grid-2">
             <div class="card">
                 <h2>Receita Diária</h2>
-                {f"<img src='{g_receita_diaria}' class='grafico' alt='Receita diária'>" if g_receita_diaria else "<p style='color: #6b7280; margin-top: 12px;'>Gráfico não disponível</p>"}
+                ${img_receita_diaria}
             </div>
             <div class="card">
                 <h2>Receita Mensal</h2>
-                {f"<img src='{g_receita_mensal}' class='grafico' alt='Receita mensal'>" if g_receita_mensal else "<p style='color: #6b7280; margin-top: 12px;'>Gráfico não disponível</p>"}
+                ${img_receita_mensal}
             </div>
         </div>
         <div class="grid grid-2">
             <div class="card">
                 <h2>Receita por Dia da Semana</h2>
-                {f"<img src='{g_receita_semana}' class='grafico' alt='Receita semanal'>" if g_receita_semana else "<p style='color: #6b7280; margin-top: 12px;'>Gráfico não disponível</p>"}
+                ${img_receita_semana}
             </div>
             <div class="card">
                 <h2>Distribuição do Ticket</h2>
-                {f"<img src='{g_ticket}' class='grafico' alt='Distribuição ticket'>" if g_ticket else "<p style='color: #6b7280; margin-top: 12px;'>Gráfico não disponível</p>"}
+                ${img_ticket}
             </div>
         </div>
         <div class="card" style="margin-top: 20px;">
             <h2>Distribuição do Ticket (Seaborn)</h2>
-            {f"<img src='{g_ticket_seaborn}' class='grafico' alt='Distribuição Ticket Seaborn'>" if g_ticket_seaborn else "<p style='color: #6b7280; margin-top: 12px;'>Gráfico não disponível</p>"}
+            ${img_ticket_seaborn}
         </div>
         <div class="card" style="margin-top: 20px;">
             <h2>Heatmap (Dia da Semana × Mês)</h2>
-            {f"<img src='{g_heatmap}' class='grafico' alt='Heatmap'>" if g_heatmap else "<p style='color: #6b7280; margin-top: 12px;'>Heatmap não disponível</p>"}
+            ${img_heatmap}
         </div>
 
         <div class="card" style="margin-top: 20px;">
@@ -415,10 +492,7 @@ class GeradorRelatorioHTML:
                     </tr>
                 </thead>
                 <tbody>
-                    {"".join(
-                        f"<tr><td>{data}</td><td style='text-align: right;'>{self._fmt_moeda(receita)}</td></tr>"
-                        for data, receita in top_dias
-                    ) if top_dias else "<tr><td colspan='2'>Sem dados</td></tr>"}
+                    ${linhas_top_dias}
                 </tbody>
             </table>
         </div>
@@ -428,7 +502,7 @@ class GeradorRelatorioHTML:
         <h2 class="title">💡 Insights Automáticos</h2>
         <div class="card">
             <ul>
-                {insights_html}
+                ${insights_html}
             </ul>
         </div>
     </section>
@@ -445,13 +519,4 @@ class GeradorRelatorioHTML:
 </div>
 </body>
 </html>
-"""
-
-        # Salva o arquivo
-        with self.caminho_saida.open("w", encoding="utf-8") as f:
-            f.write(html)
-
-        print(f"\n✅ Relatório HTML gerado: {self.caminho_saida}")
-        print(f"📂 Abra no navegador: file:///{self.caminho_saida.absolute()}\n")
-        
-        return self.caminho_saida
\ No newline at end of file
+""")
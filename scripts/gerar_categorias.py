@@ -6,17 +6,50 @@ Uso:
     python scripts/gerar_categorias.py
 """
 
+import numpy as np
 import pandas as pd
 import re
-import sys
 from pathlib import Path
+from typing import Iterable, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    _PYARROW_DISPONIVEL = True
+except ImportError:
+    _PYARROW_DISPONIVEL = False
 
-# Adiciona o diretório raiz ao path para imports funcionarem
 BASE_DIR = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(BASE_DIR))
 
-from dados.carregador import CarregadorDados
-from processamento.limpeza import LimpezaDados
+
+def ler_produtos(caminho_csv: Path) -> np.ndarray:
+    """
+    Lê só a coluna 'produto' do CSV de vendas e devolve os nomes únicos.
+    O resto do arquivo (e a limpeza completa) não é necessário aqui.
+    """
+    try:
+        produtos = pd.read_csv(caminho_csv, usecols=["produto"])["produto"]
+    except UnicodeDecodeError:
+        print("⚠️ Erro de encoding UTF-8, tentando com latin-1...")
+        produtos = pd.read_csv(caminho_csv, usecols=["produto"], encoding="latin-1")["produto"]
+    return produtos.dropna().unique()
+
+
+def salvar_csv(df: pd.DataFrame, caminho: Path) -> None:
+    """
+    Grava o CSV com o escritor em C++ do pyarrow quando disponível,
+    caindo para o to_csv do pandas se ele não estiver instalado ou falhar.
+    (O pyarrow coloca todos os textos entre aspas; a leitura é a mesma.)
+    """
+    if _PYARROW_DISPONIVEL:
+        try:
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            pa_csv.write_csv(tabela, str(caminho))
+            return
+        except Exception:
+            pass
+
+    df.to_csv(caminho, index=False, encoding="utf-8")
 
 
 class CategoriaInferidor:
@@ -54,43 +87,72 @@ class CategoriaInferidor:
             "Outros": 0.22
         }
 
+        # Uma única regex com um grupo nomeado por regra. Cada alternativa é
+        # um lookahead ancorado no início, então vence a primeira regra (na
+        # ordem do dicionário) que casar em qualquer posição — e não a
+        # ocorrência mais à esquerda, como numa alternância simples.
+        self._categorias_grupo = {}
+        alternativas = []
+        for i, (padrao, categoria) in enumerate(self.regras.items()):
+            grupo = f"r{i}"
+            self._categorias_grupo[grupo] = categoria
+            alternativas.append(f"(?=.*?(?P<{grupo}>{padrao}))")
+        self._padrao = re.compile("^(?:" + "|".join(alternativas) + ")", re.DOTALL)
+
     def inferir_categoria(self, produto: str) -> str:
         """Classifica um produto em uma categoria baseada em palavras-chave."""
-        produto_lower = produto.lower()
-        for padrao, categoria in self.regras.items():
-            if re.search(padrao, produto_lower):
-                return categoria
-        return "Outros"
+        casamento = self._padrao.search(produto.lower())
+        if casamento is None:
+            return "Outros"
+        return self._categorias_grupo[casamento.lastgroup]
 
-    def gerar_csv(self, df: pd.DataFrame) -> pd.DataFrame:
+    def gerar_csv(self, produtos: Union[pd.DataFrame, Iterable[str]]) -> pd.DataFrame:
         """
         Gera arquivo CSV com categorias e margens sugeridas.
         
         Args:
-            df: DataFrame com coluna 'produto'
+            produtos: Nomes de produtos (qualquer iterável, com repetições)
+                      ou DataFrame com coluna 'produto'
         
         Returns:
             DataFrame com categorias inferidas
         """
-        produtos_unicos = df['produto'].unique()
-        registros = []
-        
-        for produto in produtos_unicos:
-            categoria = self.inferir_categoria(produto)
-            margem = self.margens_padrao.get(categoria, 0.22)
-            registros.append([produto, categoria, margem])
-
-        df_cat = pd.DataFrame(
-            registros, 
-            columns=["produto", "categoria_sugerida", "margem_sugerida"]
+        if isinstance(produtos, pd.DataFrame):
+            produtos = produtos['produto']
+        elif not isinstance(produtos, (pd.Series, np.ndarray)):
+            produtos = list(produtos)
+        produtos_unicos = pd.unique(pd.Series(produtos, dtype=object))
+
+        # Extrai todos os grupos de uma vez; em cada linha só o grupo da
+        # regra vencedora fica preenchido (ou nenhum → "Outros")
+        grupos = (
+            pd.Series(produtos_unicos, dtype=object)
+            .str.lower()
+            .str.extract(self._padrao)
         )
+        casou = grupos.notna().to_numpy()
+        nomes_categorias = [self._categorias_grupo[g] for g in grupos.columns] + ["Outros"]
+        indice = np.where(casou.any(axis=1), casou.argmax(axis=1), len(grupos.columns))
+
+        # Categoria e margem saem por gather em arrays pequenos (uma posição
+        # por regra + "Outros"), sem listas por produto nem .map
+        categorias = np.array(nomes_categorias, dtype=object)[indice]
+        margens = np.array(
+            [self.margens_padrao.get(c, 0.22) for c in nomes_categorias], dtype=np.float64
+        )[indice]
+
+        df_cat = pd.DataFrame({
+            "produto": produtos_unicos,
+            "categoria_sugerida": categorias,
+            "margem_sugerida": margens,
+        })
 
         # Salva na pasta dados/
         pasta_dados = BASE_DIR / "dados"
         pasta_dados.mkdir(exist_ok=True)
         
         caminho = pasta_dados / "categorias_produtos.csv"
-        df_cat.to_csv(caminho, index=False, encoding="utf-8")
+        salvar_csv(df_cat, caminho)
 
         print(f"\n✅ Arquivo gerado: {caminho}")
         print(f"📦 {len(produtos_unicos)} produtos categorizados!")
@@ -108,17 +170,13 @@ if __name__ == "__main__":
     # Caminho para o CSV de vendas
     caminho_csv = BASE_DIR / "dados" / "dados_vendas.csv"
     
-    # Carrega dados
-    loader = CarregadorDados(str(caminho_csv))
-    df = loader.carregar()
-
-    # Limpa (para pegar apenas produtos válidos)
-    cleaner = LimpezaDados()
-    df_limpo = cleaner.limpar(df)
+    # Lê só os nomes de produtos (sem carregar/limpar o arquivo inteiro)
+    produtos = ler_produtos(caminho_csv)
+    print(f"📂 {len(produtos)} produtos distintos encontrados.")
 
     # Gera categorias
     inferidor = CategoriaInferidor()
-    tabela = inferidor.gerar_csv(df_limpo)
+    tabela = inferidor.gerar_csv(produtos)
     
     print("\n👀 Preview das categorias geradas:")
     print(tabela.head(10))
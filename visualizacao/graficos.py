@@ -4,12 +4,249 @@ Responsável por criar visualizações dos dados de vendas
 e salvar como arquivos de imagem (PNG) para uso no relatório.
 """
 
+import hashlib
+import io
+import json
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Union
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
+
+# Os gráficos só são salvos em arquivo: o backend Agg (sem janela) evita a
+# sondagem de toolkits gráficos e os ganchos de laço de eventos
+matplotlib.use("Agg", force=True)
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib import cycler  # noqa: E402
+from matplotlib.colors import ListedColormap, to_rgba  # noqa: E402
+
+plt.ioff()
+
+# Manifesto dos PNGs gerados (ver GraficosVendas.gerar_todos)
+_ARQUIVO_MANIFESTO = ".manifest.json"
+# Colunas de que os gráficos dependem: entram na impressão digital
+_COLUNAS_GRAFICOS = ("data", "receita", "produto", "mes", "dia_semana")
+# Rótulos de dia da semana, indexados pelo dayofweek (0 = segunda)
+_DIAS_SEMANA = np.array(["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"])
+# Tema "darkgrid" (o mesmo que sns.set_theme(style="darkgrid") aplicava),
+# sem importar o seaborn
+_TEMA_DARKGRID = {
+    "axes.axisbelow": True,
+    "axes.edgecolor": "white",
+    "axes.facecolor": "#EAEAF2",
+    "axes.labelcolor": ".15",
+    "axes.labelsize": 12.0,
+    "axes.linewidth": 1.25,
+    "axes.prop_cycle": cycler(color=[
+        "#4C72B0", "#DD8452", "#55A868", "#C44E52", "#8172B3",
+        "#937860", "#DA8BC3", "#8C8C8C", "#CCB974", "#64B5CD",
+    ]),
+    "axes.titlesize": 12.0,
+    "font.sans-serif": ["Arial", "DejaVu Sans", "Liberation Sans", "Bitstream Vera Sans", "sans-serif"],
+    "font.size": 12.0,
+    "grid.color": "white",
+    "grid.linewidth": 1.0,
+    "legend.fontsize": 11.0,
+    "legend.title_fontsize": 12.0,
+    "lines.solid_capstyle": "round",
+    "patch.edgecolor": "w",
+    "patch.force_edgecolor": True,
+    "text.color": ".15",
+    "xtick.bottom": False,
+    "xtick.color": ".15",
+    "xtick.labelsize": 11.0,
+    "xtick.major.size": 6.0,
+    "xtick.major.width": 1.25,
+    "xtick.minor.size": 4.0,
+    "xtick.minor.width": 1.0,
+    "ytick.color": ".15",
+    "ytick.labelsize": 11.0,
+    "ytick.left": False,
+    "ytick.major.size": 6.0,
+    "ytick.major.width": 1.25,
+    "ytick.minor.size": 4.0,
+    "ytick.minor.width": 1.0,
+}
+# Mapa de cores "rocket" do seaborn (padrão do sns.heatmap), embutido para
+# o heatmap não depender do seaborn: 256 cores RGB de seaborn.cm._rocket_lut
+_ROCKET = ListedColormap([
+    (0.01060815, 0.01808215, 0.10018654), (0.01428972, 0.02048237, 0.10374486),
+    (0.01831941, 0.02297660, 0.10738511), (0.02275049, 0.02554464, 0.11108639),
+    (0.02759119, 0.02818316, 0.11483751), (0.03285175, 0.03088792, 0.11863035),
+    (0.03853466, 0.03365771, 0.12245873), (0.04447016, 0.03648425, 0.12631831),
+    (0.05032105, 0.03936808, 0.13020508), (0.05611171, 0.04224835, 0.13411624),
+    (0.06185310, 0.04504866, 0.13804929), (0.06755457, 0.04778179, 0.14200206),
+    (0.07322360, 0.05045047, 0.14597263), (0.07887080, 0.05305461, 0.14995981),
+    (0.08450105, 0.05559631, 0.15396203), (0.09011319, 0.05808059, 0.15797687),
+    (0.09572396, 0.06050127, 0.16200507), (0.10132312, 0.06286782, 0.16604287),
+    (0.10692823, 0.06517224, 0.17009175), (0.11253150, 0.06742194, 0.17414848),
+    (0.11813947, 0.06961499, 0.17821272), (0.12375803, 0.07174938, 0.18228425),
+    (0.12938228, 0.07383015, 0.18636053), (0.13501631, 0.07585609, 0.19044109),
+    (0.14066867, 0.07782240, 0.19452676), (0.14633406, 0.07973393, 0.19861510),
+    (0.15201338, 0.08159108, 0.20270523), (0.15770877, 0.08339312, 0.20679668),
+    (0.16342174, 0.08513960, 0.21088893), (0.16915387, 0.08682996, 0.21498104),
+    (0.17489524, 0.08848235, 0.21902940), (0.18065495, 0.09009031, 0.22303512),
+    (0.18643324, 0.09165431, 0.22699705), (0.19223028, 0.09317479, 0.23091409),
+    (0.19804623, 0.09465217, 0.23478512), (0.20388117, 0.09608689, 0.23860907),
+    (0.20973515, 0.09747934, 0.24238489), (0.21560818, 0.09882993, 0.24611154),
+    (0.22150014, 0.10013944, 0.24978680), (0.22741085, 0.10140876, 0.25340813),
+    (0.23334047, 0.10263737, 0.25697736), (0.23928891, 0.10382562, 0.26049360),
+    (0.24525608, 0.10497384, 0.26395596), (0.25124182, 0.10608236, 0.26736359),
+    (0.25724602, 0.10715148, 0.27071569), (0.26326851, 0.10818150, 0.27401148),
+    (0.26930915, 0.10917270, 0.27725020), (0.27536766, 0.11012568, 0.28043021),
+    (0.28144375, 0.11104133, 0.28354890), (0.28753740, 0.11191896, 0.28660853),
+    (0.29364846, 0.11275876, 0.28960850), (0.29977678, 0.11356089, 0.29254823),
+    (0.30592213, 0.11432553, 0.29542718), (0.31208435, 0.11505284, 0.29824485),
+    (0.31826327, 0.11574290, 0.30100076), (0.32445869, 0.11639585, 0.30369448),
+    (0.33067031, 0.11701189, 0.30632563), (0.33689808, 0.11759095, 0.30889380),
+    (0.34314168, 0.11813362, 0.31139721), (0.34940101, 0.11863987, 0.31383550),
+    (0.35567600, 0.11910909, 0.31620996), (0.36196644, 0.11954130, 0.31852037),
+    (0.36827206, 0.11993653, 0.32076656), (0.37459292, 0.12029443, 0.32294825),
+    (0.38092887, 0.12061482, 0.32506528), (0.38727975, 0.12089756, 0.32711750),
+    (0.39364518, 0.12114272, 0.32910494), (0.40002537, 0.12134964, 0.33102734),
+    (0.40642019, 0.12151801, 0.33288464), (0.41282936, 0.12164769, 0.33467689),
+    (0.41925278, 0.12173833, 0.33640407), (0.42569057, 0.12178916, 0.33806605),
+    (0.43214263, 0.12179973, 0.33966284), (0.43860848, 0.12177004, 0.34119475),
+    (0.44508855, 0.12169883, 0.34266151), (0.45158266, 0.12158557, 0.34406324),
+    (0.45809049, 0.12142996, 0.34540024), (0.46461238, 0.12123063, 0.34667231),
+    (0.47114798, 0.12098721, 0.34787978), (0.47769736, 0.12069864, 0.34902273),
+    (0.48426077, 0.12036349, 0.35010104), (0.49083761, 0.11998161, 0.35111537),
+    (0.49742847, 0.11955087, 0.35206533), (0.50403286, 0.11907081, 0.35295152),
+    (0.51065109, 0.11853959, 0.35377385), (0.51728314, 0.11795580, 0.35453252),
+    (0.52392883, 0.11731817, 0.35522789), (0.53058853, 0.11662445, 0.35585982),
+    (0.53726173, 0.11587369, 0.35642903), (0.54394898, 0.11506307, 0.35693521),
+    (0.55064260, 0.11420757, 0.35737863), (0.55734473, 0.11330456, 0.35775059),
+    (0.56405586, 0.11235265, 0.35804813), (0.57077365, 0.11135597, 0.35827146),
+    (0.57749910, 0.11031233, 0.35841679), (0.58422945, 0.10922707, 0.35848469),
+    (0.59096382, 0.10810205, 0.35847347), (0.59770215, 0.10693774, 0.35838029),
+    (0.60444226, 0.10573912, 0.35820487), (0.61118304, 0.10450943, 0.35794557),
+    (0.61792306, 0.10325288, 0.35760108), (0.62466162, 0.10197244, 0.35716891),
+    (0.63139686, 0.10067417, 0.35664819), (0.63812122, 0.09938212, 0.35603757),
+    (0.64483795, 0.09808910, 0.35533555), (0.65154562, 0.09680192, 0.35454107),
+    (0.65824241, 0.09552918, 0.35365290), (0.66492652, 0.09428017, 0.35266970),
+    (0.67159578, 0.09306598, 0.35159077), (0.67824099, 0.09192342, 0.35041480),
+    (0.68486300, 0.09085633, 0.34914061), (0.69146268, 0.08986750, 0.34776864),
+    (0.69803757, 0.08897226, 0.34629860), (0.70457834, 0.08821290, 0.34473046),
+    (0.71108138, 0.08761223, 0.34306350), (0.71755070, 0.08716212, 0.34129974),
+    (0.72398193, 0.08688725, 0.33943958), (0.73035829, 0.08686230, 0.33748452),
+    (0.73669146, 0.08704683, 0.33543669), (0.74297501, 0.08747196, 0.33329799),
+    (0.74919318, 0.08820542, 0.33107204), (0.75535825, 0.08919792, 0.32876184),
+    (0.76145589, 0.09050716, 0.32637117), (0.76748424, 0.09213602, 0.32390525),
+    (0.77344838, 0.09405684, 0.32136808), (0.77932641, 0.09634794, 0.31876642),
+    (0.78513609, 0.09892473, 0.31610488), (0.79085854, 0.10184672, 0.31339100),
+    (0.79650140, 0.10506637, 0.31063031), (0.80205987, 0.10858333, 0.30783000),
+    (0.80752799, 0.11239964, 0.30499738), (0.81291606, 0.11645784, 0.30213802),
+    (0.81820481, 0.12080606, 0.29926105), (0.82341472, 0.12535343, 0.29637050),
+    (0.82852822, 0.13014118, 0.29347474), (0.83355779, 0.13511035, 0.29057852),
+    (0.83850183, 0.14025098, 0.28768780), (0.84335441, 0.14556683, 0.28480819),
+    (0.84813096, 0.15099892, 0.28194300), (0.85281737, 0.15657772, 0.27909826),
+    (0.85742602, 0.16225830, 0.27627462), (0.86196552, 0.16801239, 0.27346473),
+    (0.86641628, 0.17387796, 0.27070818), (0.87079129, 0.17982114, 0.26797378),
+    (0.87507281, 0.18587368, 0.26529697), (0.87925878, 0.19203259, 0.26268136),
+    (0.88334170, 0.19830556, 0.26014181), (0.88731387, 0.20469941, 0.25769539),
+    (0.89116859, 0.21121788, 0.25535920), (0.89490337, 0.21785614, 0.25314362),
+    (0.89850260, 0.22463251, 0.25108745), (0.90197527, 0.23152063, 0.24918223),
+    (0.90530097, 0.23854541, 0.24748098), (0.90848638, 0.24568473, 0.24598324),
+    (0.91153300, 0.25292623, 0.24470258), (0.91442250, 0.26028902, 0.24369359),
+    (0.91717106, 0.26773821, 0.24294137), (0.91978131, 0.27526191, 0.24245973),
+    (0.92223947, 0.28287251, 0.24229568), (0.92456587, 0.29053388, 0.24242622),
+    (0.92676657, 0.29823282, 0.24285536), (0.92882964, 0.30598085, 0.24362274),
+    (0.93078135, 0.31373977, 0.24468803), (0.93262051, 0.32150930, 0.24606461),
+    (0.93435067, 0.32928362, 0.24775328), (0.93599076, 0.33703942, 0.24972157),
+    (0.93752831, 0.34479177, 0.25199928), (0.93899289, 0.35250734, 0.25452808),
+    (0.94036561, 0.36020899, 0.25734661), (0.94167588, 0.36786594, 0.26039490),
+    (0.94291042, 0.37549479, 0.26369821), (0.94408513, 0.38308110, 0.26722004),
+    (0.94520419, 0.39062329, 0.27094924), (0.94625977, 0.39813168, 0.27489742),
+    (0.94727016, 0.40559090, 0.27902322), (0.94823505, 0.41300424, 0.28332283),
+    (0.94914549, 0.42038251, 0.28780969), (0.95001704, 0.42771398, 0.29244728),
+    (0.95085121, 0.43500005, 0.29722817), (0.95165009, 0.44224144, 0.30214494),
+    (0.95240440, 0.44944853, 0.30721050), (0.95312556, 0.45661389, 0.31239776),
+    (0.95381595, 0.46373781, 0.31769923), (0.95447591, 0.47082238, 0.32310953),
+    (0.95510255, 0.47787236, 0.32862553), (0.95569679, 0.48489115, 0.33421404),
+    (0.95626788, 0.49187351, 0.33985601), (0.95681685, 0.49882008, 0.34555431),
+    (0.95734390, 0.50573243, 0.35130912), (0.95784842, 0.51261283, 0.35711942),
+    (0.95833051, 0.51946267, 0.36298589), (0.95879054, 0.52628305, 0.36890904),
+    (0.95922872, 0.53307513, 0.37488950), (0.95964538, 0.53983991, 0.38092784),
+    (0.96004345, 0.54657593, 0.38702920), (0.96042097, 0.55328624, 0.39319057),
+    (0.96077819, 0.55997184, 0.39941173), (0.96111520, 0.56663370, 0.40569343),
+    (0.96143273, 0.57327231, 0.41203603), (0.96173392, 0.57988594, 0.41844491),
+    (0.96201757, 0.58647675, 0.42491751), (0.96228344, 0.59304598, 0.43145271),
+    (0.96253168, 0.59959440, 0.43805131), (0.96276513, 0.60612062, 0.44471698),
+    (0.96298491, 0.61262470, 0.45145074), (0.96318967, 0.61910879, 0.45824902),
+    (0.96337949, 0.62557360, 0.46511271), (0.96355923, 0.63201624, 0.47204746),
+    (0.96372785, 0.63843852, 0.47905028), (0.96388426, 0.64484214, 0.48611960),
+    (0.96403203, 0.65122535, 0.49325780), (0.96417332, 0.65758729, 0.50046894),
+    (0.96430630, 0.66393045, 0.50774670), (0.96443322, 0.67025402, 0.51509334),
+    (0.96455845, 0.67655564, 0.52251447), (0.96467922, 0.68283846, 0.53000231),
+    (0.96479861, 0.68910113, 0.53756026), (0.96492035, 0.69534192, 0.54519170),
+    (0.96504223, 0.70156360, 0.55288920), (0.96516917, 0.70776351, 0.56065930),
+    (0.96530224, 0.71394212, 0.56849894), (0.96544032, 0.72010124, 0.57640375),
+    (0.96559206, 0.72623592, 0.58438387), (0.96575293, 0.73235058, 0.59242739),
+    (0.96592829, 0.73844258, 0.60053991), (0.96612013, 0.74451182, 0.60871954),
+    (0.96632832, 0.75055966, 0.61696136), (0.96656022, 0.75658231, 0.62527295),
+    (0.96681185, 0.76258381, 0.63364277), (0.96709183, 0.76855969, 0.64207921),
+    (0.96739773, 0.77451297, 0.65057302), (0.96773482, 0.78044149, 0.65912731),
+    (0.96810471, 0.78634563, 0.66773889), (0.96850919, 0.79222565, 0.67640460),
+    (0.96893132, 0.79809112, 0.68512266), (0.96935926, 0.80395415, 0.69383201),
+    (0.96980280, 0.80981139, 0.70252255), (0.97025511, 0.81566605, 0.71120296),
+    (0.97071849, 0.82151775, 0.71987163), (0.97120159, 0.82736371, 0.72851999),
+    (0.97169389, 0.83320847, 0.73716071), (0.97220061, 0.83905052, 0.74578903),
+    (0.97272597, 0.84488881, 0.75440141), (0.97327085, 0.85072354, 0.76299805),
+    (0.97383206, 0.85655639, 0.77158353), (0.97441222, 0.86238689, 0.78015619),
+    (0.97501782, 0.86821321, 0.78871034), (0.97564391, 0.87403763, 0.79725261),
+    (0.97628674, 0.87986189, 0.80578830), (0.97696114, 0.88568129, 0.81430324),
+    (0.97765722, 0.89149971, 0.82280948), (0.97837585, 0.89731727, 0.83130786),
+    (0.97912374, 0.90313207, 0.83979337), (0.97989100, 0.90894778, 0.84827858),
+    (0.98067764, 0.91476465, 0.85676611), (0.98137749, 0.92061729, 0.86536915),
+], name="rocket")
+# Suba ao mudar o desenho de algum gráfico, para invalidar os PNGs antigos
+_VERSAO_GRAFICOS = 5
+
+
+def _densidade_kde_fft(valores: np.ndarray, pontos: int = 1024) -> Optional[tuple]:
+    """
+    KDE gaussiana por FFT, avaliada em `pontos` pontos de [mín, máx].
+
+    Mesma estimativa do kde=True do seaborn (banda de Scott, suporte sem
+    extrapolar os dados), mas em O(N + M log M): os valores são
+    distribuídos linearmente na grade e convoluídos com o kernel via FFT,
+    em vez de somar N gaussianas em cada ponto. Devolve (x, densidade),
+    ou None se a amostra não tiver dispersão (o seaborn também omite a
+    curva nesse caso).
+    """
+    valores = valores[np.isfinite(valores)]
+    n = len(valores)
+    if n < 2:
+        return None
+    banda = valores.std(ddof=1) * n ** (-1 / 5)
+    inicio, fim = valores.min(), valores.max()
+    if banda <= 0 or fim <= inicio:
+        return None
+
+    # Binning linear: cada valor divide seu peso entre os 2 pontos vizinhos
+    passo = (fim - inicio) / (pontos - 1)
+    posicao = (valores - inicio) / passo
+    esquerda = np.minimum(posicao.astype(np.int64), pontos - 1)
+    peso_direita = posicao - esquerda
+    grade = (
+        np.bincount(esquerda, weights=1 - peso_direita, minlength=pontos + 1)
+        + np.bincount(esquerda + 1, weights=peso_direita, minlength=pontos + 1)
+    )[:pontos]
+
+    # Convolução linear (sem dar a volta) com o kernel em -(M-1)..(M-1) passos
+    deslocamentos = np.arange(-(pontos - 1), pontos) * passo
+    kernel = np.exp(-0.5 * (deslocamentos / banda) ** 2) / (banda * np.sqrt(2 * np.pi))
+    tamanho = 1 << int(np.ceil(np.log2(3 * pontos - 2)))
+    convolucao = np.fft.irfft(
+        np.fft.rfft(grade, tamanho) * np.fft.rfft(kernel, tamanho), tamanho
+    )
+    densidade = np.maximum(convolucao[pontos - 1 : 2 * pontos - 1], 0) / n
+    return np.linspace(inicio, fim, pontos), densidade
 
 
 class GraficosVendas:
@@ -17,6 +254,29 @@ class GraficosVendas:
     Classe responsável por gerar gráficos a partir do DataFrame limpo.
     """
 
+    # Abaixo disso, subir os processos do pool (cada um importa pandas e
+    # matplotlib) custa mais do que desenhar os gráficos em série
+    LINHAS_MIN_PARALELO = 100_000
+
+    # Boxplot e histograma resumem a distribuição: acima disso, desenham
+    # uma amostra aleatória (fixa, semente 0) em vez de todas as linhas
+    TAMANHO_AMOSTRA = 200_000
+
+    # Gráficos de gerar_todos, em grupos que rodam em série no mesmo
+    # processo. O heatmap fica junto do gráfico "seaborn" porque herda o
+    # tema darkgrid que ele aplica (_TEMA_DARKGRID)
+    _GRUPOS = (
+        (("receita_diaria", "grafico_receita_diaria"),),
+        (("receita_mensal", "grafico_receita_mensal"),),
+        (("receita_dia_semana", "grafico_receita_por_dia_semana"),),
+        (("top_produtos", "grafico_top_produtos"),),
+        (("distribuicao_ticket", "grafico_distribuicao_ticket"),),
+        (
+            ("distribuicao_ticket_seaborn", "grafico_distribuicao_ticket_seaborn"),
+            ("heatmap_mes_semana", "grafico_heatmap_mes_semana"),
+        ),
+    )
+
     def __init__(self, pasta_saida: str = "output/graficos"):
         self.pasta_saida = Path(pasta_saida)
         self.pasta_saida.mkdir(parents=True, exist_ok=True)
@@ -26,22 +286,179 @@ class GraficosVendas:
         plt.rcParams["axes.grid"] = True
         plt.rcParams["font.size"] = 10
 
+        # Desempenho: sem aviso de muitas figuras abertas e com caminhos
+        # longos rasterizados em blocos
+        plt.rcParams["figure.max_open_warning"] = 0
+        plt.rcParams["path.simplify"] = True
+        plt.rcParams["agg.path.chunksize"] = 10000
+
+        # Figura única, reaproveitada por todos os gráficos (ver _nova_figura)
+        self._figura = None
+        # Gravação dos PNGs em segundo plano (ver _escrita_em_segundo_plano)
+        self._escritor: Optional[ThreadPoolExecutor] = None
+        self._escritas: list = []
+
+    def _nova_figura(self):
+        """
+        Deixa a figura compartilhada limpa e como figura atual do pyplot.
+
+        Todos os gráficos têm o mesmo tamanho e dpi, então limpar a mesma
+        figura (clf) reaproveita o canvas e o renderer Agg, em vez de
+        montar uma figura nova a cada gráfico. Os eixos são recriados a
+        cada vez, com o estilo vigente (ex.: o tema darkgrid).
+        """
+        if self._figura is None or not plt.fignum_exists(self._figura.number):
+            self._figura = plt.figure()
+        else:
+            self._figura.clf()
+            # o tight_layout do gráfico anterior alterou as margens
+            self._figura.subplots_adjust(**{
+                lado: plt.rcParams[f"figure.subplot.{lado}"]
+                for lado in ("left", "right", "bottom", "top", "wspace", "hspace")
+            })
+            plt.figure(self._figura.number)
+        return self._figura
+
+    def fechar(self):
+        """Libera a figura compartilhada."""
+        if self._figura is not None:
+            plt.close(self._figura)
+            self._figura = None
+
+    @contextmanager
+    def _escrita_em_segundo_plano(self):
+        """
+        Durante o bloco, _salvar_figura só codifica o PNG em memória e
+        entrega a gravação em disco a uma thread, que escreve enquanto o
+        próximo gráfico é desenhado. Na saída espera todas as gravações
+        (e repassa o erro de alguma que tenha falhado, se o bloco em si
+        terminou sem erro: uma exceção do bloco nunca é substituída).
+        """
+        if self._escritor is not None:  # já dentro de um bloco
+            yield
+            return
+        self._escritor = ThreadPoolExecutor(max_workers=1)
+        try:
+            yield
+        finally:
+            escritor, escritas = self._escritor, self._escritas
+            self._escritor, self._escritas = None, []
+            escritor.shutdown(wait=True)
+        for escrita in escritas:
+            escrita.result()
+
     def _salvar_figura(self, nome_arquivo: str):
         caminho = self.pasta_saida / nome_arquivo
         plt.tight_layout()
-        plt.savefig(caminho, dpi=150, bbox_inches="tight")
-        plt.close()
+        # compress_level=1: o zlib rápido domina o tempo de salvar o PNG;
+        # a imagem é a mesma, só o arquivo fica um pouco maior
+        buffer = io.BytesIO()
+        plt.savefig(
+            buffer,
+            format="png",
+            dpi=150,
+            pil_kwargs={"compress_level": 1, "optimize": False},
+        )
+        if self._escritor is None:
+            caminho.write_bytes(buffer.getvalue())
+        else:
+            self._escritas.append(self._escritor.submit(caminho.write_bytes, buffer.getvalue()))
         return caminho
 
+    @staticmethod
+    def _agregar(df: pd.DataFrame) -> Dict[str, Union[pd.Series, np.ndarray]]:
+        """
+        Receita por data, (ano, mês), dia da semana e produto.
+
+        Só data e produto passam pelas N linhas, e em NumPy: as colunas
+        viram arrays uma vez e as somas saem de np.bincount sobre chaves
+        inteiras (dia do calendário e código da categoria), sem o índice e
+        a tabela hash do groupby. Ano, mês e dia da semana são funções da
+        data, então saem das somas diárias (uma linha por data).
+        A receita por dia da semana é um vetor de 7 posições (0 = segunda).
+        """
+        datas = df["data"].to_numpy()
+        receita = df["receita"].to_numpy(dtype=np.float64)
+        por_produto = GraficosVendas._somar_por_produto(df["produto"], receita)
+
+        validas = ~np.isnat(datas)
+        if not validas.all():
+            datas, receita = datas[validas], receita[validas]
+
+        # Datas só com o dia (caso da base limpa): a chave é o número do dia
+        # no calendário, já em ordem. Com horário, np.unique ordena e indexa
+        dias = datas.astype("datetime64[D]")
+        if (dias == datas).all():
+            numero = dias.view(np.int64)
+            inicio = numero.min() if len(numero) else 0
+            posicao = numero - inicio
+            presentes = np.bincount(posicao) > 0
+            somas = np.bincount(posicao, weights=receita)[presentes]
+            chaves = (np.flatnonzero(presentes) + inicio).astype("datetime64[D]")
+        else:
+            chaves, inverso = np.unique(datas, return_inverse=True)
+            somas = np.bincount(inverso, weights=receita, minlength=len(chaves))
+
+        # Ordenada por data (é o eixo x do gráfico de linha)
+        por_data = pd.Series(
+            somas,
+            index=pd.DatetimeIndex(chaves.astype(datas.dtype), name="data"),
+            name="receita",
+        )
+        indice = por_data.index
+
+        return {
+            "diaria": por_data,
+            "mensal": por_data.groupby(
+                [indice.year.rename("ano"), indice.month.rename("mes")], sort=False
+            ).sum(),
+            "semana": np.bincount(
+                indice.dayofweek, weights=por_data.to_numpy(), minlength=7
+            ),
+            "produto": por_produto,
+        }
+
+    @staticmethod
+    def _somar_por_produto(produto: pd.Series, receita: np.ndarray) -> pd.Series:
+        """
+        Receita por produto via bincount sobre os códigos do produto.
+
+        Produto categórico (como sai da limpeza) já traz os códigos; texto
+        (object) é fatorado uma vez, o mesmo hash por valor único que a
+        conversão para category faria.
+        """
+        if isinstance(produto.dtype, pd.CategoricalDtype):
+            codigos = produto.cat.codes.to_numpy()
+            nomes = produto.cat.categories
+        else:
+            codigos, nomes = pd.factorize(produto)
+
+        # -1 = produto ausente, fora da soma (como no groupby)
+        com_produto = codigos >= 0
+        if not com_produto.all():
+            codigos, receita = codigos[com_produto], receita[com_produto]
+
+        observados = np.bincount(codigos, minlength=len(nomes)) > 0
+        somas = np.bincount(codigos, weights=receita, minlength=len(nomes))
+        return pd.Series(
+            somas[observados],
+            index=pd.Index(np.asarray(nomes)[observados], name="produto"),
+            name="receita",
+        )
+
     # ------------------------------------------------------------------ #
     # Gráficos principais
+    # (cada um aceita a agregação pronta; sem ela, calcula a partir do df)
     # ------------------------------------------------------------------ #
 
-    def grafico_receita_diaria(self, df: pd.DataFrame) -> Path:
+    def grafico_receita_diaria(
+        self, df: pd.DataFrame, receita_diaria: Optional[pd.Series] = None
+    ) -> Path:
         """Linha de receita por dia (visão geral do ano)."""
-        receita_diaria = df.groupby("data")["receita"].sum()
+        if receita_diaria is None:
+            receita_diaria = df.groupby("data")["receita"].sum()
 
-        plt.figure()
+        self._nova_figura()
         plt.plot(receita_diaria.index, receita_diaria.values, linewidth=1.8)
         plt.title("Evolução da Receita Diária")
         plt.xlabel("Data")
@@ -49,20 +466,27 @@ class GraficosVendas:
         plt.xticks(rotation=45)
         return self._salvar_figura("receita_diaria.png")
 
-    def grafico_receita_mensal(self, df: pd.DataFrame) -> Path:
+    def grafico_receita_mensal(
+        self, df: pd.DataFrame, receita_mensal: Optional[pd.Series] = None
+    ) -> Path:
         """Barra de receita mensal."""
+        if receita_mensal is None:
+            receita_mensal = df.groupby(
+                ["ano", "mes"], observed=True, sort=False
+            )["receita"].sum()
         receita_mensal = (
-            df.groupby(["ano", "mes"])["receita"]
-            .sum()
+            receita_mensal
             .reset_index()
             .sort_values(["ano", "mes"])
         )
         # cria coluna ano-mês no formato 2024-01
-        receita_mensal["ano_mes"] = receita_mensal.apply(
-            lambda x: f"{int(x['ano'])}-{int(x['mes']):02d}", axis=1
+        receita_mensal["ano_mes"] = (
+            receita_mensal["ano"].astype(int).astype(str)
+            + "-"
+            + receita_mensal["mes"].astype(int).astype(str).str.zfill(2)
         )
 
-        plt.figure()
+        self._nova_figura()
         plt.bar(receita_mensal["ano_mes"], receita_mensal["receita"])
         plt.title("Receita Mensal")
         plt.xlabel("Mês")
@@ -70,66 +494,103 @@ class GraficosVendas:
         plt.xticks(rotation=45)
         return self._salvar_figura("receita_mensal.png")
 
-    def grafico_receita_por_dia_semana(self, df: pd.DataFrame) -> Path:
-        """Barra de receita agregada por dia da semana."""
-        mapa_dias = {
-            0: "Seg",
-            1: "Ter",
-            2: "Qua",
-            3: "Qui",
-            4: "Sex",
-            5: "Sáb",
-            6: "Dom",
-        }
-        receita_semana = df.groupby("dia_semana")["receita"].sum()
-        labels = [mapa_dias.get(i, str(i)) for i in range(7)]
-        valores = [receita_semana.get(i, 0) for i in range(7)]
+    def grafico_receita_por_dia_semana(
+        self, df: pd.DataFrame, receita_semana: Optional[np.ndarray] = None
+    ) -> Path:
+        """
+        Barra de receita agregada por dia da semana.
 
-        plt.figure()
-        plt.bar(labels, valores)
+        receita_semana, se informada, é o vetor de 7 somas (0 = segunda).
+        """
+        if receita_semana is None:
+            # chave inteira 0-6: bincount soma tudo numa passada, sem a
+            # tabela hash do groupby
+            receita_semana = np.bincount(
+                df["dia_semana"].to_numpy(dtype=np.int64),
+                weights=df["receita"].to_numpy(dtype=np.float64),
+                minlength=7,
+            )
+        valores = receita_semana[:7]
+
+        self._nova_figura()
+        plt.bar(_DIAS_SEMANA, valores)
         plt.title("Receita por Dia da Semana")
         plt.xlabel("Dia da semana")
         plt.ylabel("Receita (R$)")
         return self._salvar_figura("receita_dia_semana.png")
 
-    def grafico_top_produtos(self, df: pd.DataFrame, n: int = 10) -> Path:
+    def grafico_top_produtos(
+        self, df: pd.DataFrame, n: int = 10, receita_produto: Optional[pd.Series] = None
+    ) -> Path:
         """Top N produtos por receita (barra horizontal)."""
-        top = (
-            df.groupby("produto")["receita"]
-            .sum()
-            .nlargest(n)
-            .sort_values(ascending=True)
-        )
-
-        plt.figure()
-        plt.barh(top.index, top.values)
+        if receita_produto is None:
+            receita_produto = self._somar_por_produto(
+                df["produto"], df["receita"].to_numpy(dtype=np.float64)
+            )
+
+        # argpartition separa os N maiores em O(G); só eles são ordenados
+        # (crescente: o maior fica no topo do barh)
+        valores = receita_produto.to_numpy()
+        k = max(min(n, len(valores)), 0)
+        if 0 < k < len(valores):
+            indices = np.argpartition(valores, -k)[-k:]
+        else:
+            indices = np.arange(len(valores) if k else 0)
+        ordem = indices[np.argsort(valores[indices], kind="stable")]
+
+        self._nova_figura()
+        plt.barh(receita_produto.index.to_numpy()[ordem], valores[ordem])
         plt.title(f"Top {n} Produtos por Receita")
         plt.xlabel("Receita (R$)")
         plt.ylabel("Produto")
         return self._salvar_figura("top_produtos.png")
 
+    def _amostra_receita(self, df: pd.DataFrame) -> np.ndarray:
+        """Receita por linha, amostrada sem reposição se passar de TAMANHO_AMOSTRA."""
+        receita = df["receita"].to_numpy(dtype=np.float64)
+        if len(receita) <= self.TAMANHO_AMOSTRA:
+            return receita
+        sorteio = np.random.default_rng(0).choice(
+            len(receita), self.TAMANHO_AMOSTRA, replace=False
+        )
+        return receita[sorteio]
+
     def grafico_distribuicao_ticket(self, df: pd.DataFrame) -> Path:
         """Boxplot do valor por transação (receita por linha)."""
-        plt.figure()
-        plt.boxplot(df["receita"], vert=False)
+        self._nova_figura()
+        plt.boxplot(self._amostra_receita(df), vert=False)
         plt.title("Distribuição da Receita por Transação")
         plt.xlabel("Receita por transação (R$)")
         return self._salvar_figura("distribuicao_ticket.png")
 
     def grafico_distribuicao_ticket_seaborn(self, df: pd.DataFrame) -> Path:
         """Distribuição do ticket com histograma + KDE em estilo premium."""
-        import seaborn as sns
-
-        plt.figure(figsize=(12, 6))
-        sns.set_theme(style="darkgrid")
-
-        ax = sns.histplot(
-            df["receita"], 
-            bins=30, 
-            kde=True,
-            stat="density",
-            alpha=0.85
+        valores = self._amostra_receita(df)
+
+        self._nova_figura()
+        plt.rcParams.update(_TEMA_DARKGRID)
+
+        # Histograma em densidade, com as barras no estilo do histplot do
+        # seaborn: contagem por np.histogram e desenho direto com ax.bar
+        densidades, bordas = np.histogram(valores, bins=30, density=True)
+        ax = plt.gca()
+        barras = ax.bar(
+            bordas[:-1],
+            densidades,
+            np.diff(bordas),
+            align="edge",
+            color="none",
+            facecolor=to_rgba("C0", 0.85),
+            edgecolor=plt.rcParams["patch.edgecolor"],
         )
+        for barra in barras:
+            barra.sticky_edges.y[:] = (0, np.inf)
+
+        # KDE por FFT no lugar do kde=True do seaborn (soma direta O(N·M))
+        densidade = _densidade_kde_fft(valores)
+        if densidade is not None:
+            linha, = ax.plot(*densidade, color="C0")
+            linha.sticky_edges.y[:] = (0, np.inf)
 
         ax.set_title("Distribuição da Receita por Transação (Seaborn)", fontsize=14, fontweight="bold")
         ax.set_xlabel("Receita por transação (R$)")
@@ -143,38 +604,38 @@ class GraficosVendas:
         Heatmap simples: receita por mês (coluna) x dia da semana (linha).
         Se tiver poucos meses, ainda assim gera.
         """
-        try:
-            import numpy as np  # usado só aqui
-        except ImportError:
-            return None
-
-        tabela = df.pivot_table(
-            values="receita",
-            index="dia_semana",
-            columns="mes",
-            aggfunc="sum",
-            fill_value=0,
+        # groupby + unstack monta a mesma tabela que o pivot_table, sem a
+        # resolução de aggfunc/margens e a expansão cartesiana dele
+        tabela = (
+            df.groupby(["dia_semana", "mes"], observed=True, sort=False)["receita"]
+            .sum()
+            .unstack("mes", fill_value=0)
+            .sort_index()
+            .sort_index(axis=1)
         )
 
         if tabela.empty:
             return None
 
-        plt.figure()
-        plt.imshow(tabela.values, aspect="auto")
+        self._nova_figura()
+        # Poucas células ampliadas: nearest já é o resultado certo e evita o
+        # reamostrador antialiased
+        plt.imshow(
+            tabela.values, cmap=_ROCKET, aspect="auto", interpolation="nearest", rasterized=True
+        )
         plt.colorbar(label="Receita (R$)")
         plt.title("Heatmap: Receita por Dia da Semana x Mês")
         plt.xlabel("Mês")
         plt.ylabel("Dia da semana")
 
-        # Eixos
+        # Eixos: rótulos montados de uma vez a partir das chaves ordenadas
         plt.xticks(
             range(len(tabela.columns)),
-            [f"{int(m):02d}" for m in tabela.columns],
+            tabela.columns.astype(int).astype(str).str.zfill(2),
         )
-        mapa_dias = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
         plt.yticks(
             range(len(tabela.index)),
-            [mapa_dias[int(d)] for d in tabela.index],
+            _DIAS_SEMANA[tabela.index.to_numpy(dtype=np.int64)],
         )
 
         return self._salvar_figura("heatmap_mes_semana.png")
@@ -183,21 +644,61 @@ class GraficosVendas:
     # Função de conveniência para gerar tudo
     # ------------------------------------------------------------------ #
 
-    def gerar_todos(self, df: pd.DataFrame) -> dict:
+    def gerar_todos(
+        self, df: pd.DataFrame, processos: Optional[int] = None, forcar: bool = False
+    ) -> dict:
         """
         Gera todos os gráficos principais e devolve um dicionário
         com os caminhos relativos para uso no relatório HTML.
+
+        Os gráficos são independentes: em bases grandes são renderizados
+        em paralelo num pool de processos (contexto "spawn", seguro para o matplotlib
+        em qualquer SO). Cada processo recebe só o que desenha: as
+        agregações prontas ou as poucas colunas do df que o gráfico usa.
+
+        Um manifesto na pasta de saída guarda a impressão digital dos dados
+        de cada PNG: se os dados não mudaram e o arquivo existe, o gráfico
+        é reaproveitado em vez de desenhado de novo.
+
+        Args:
+            df: DataFrame limpo
+            processos: Máximo de processos. None usa um por núcleo a
+                       partir de LINHAS_MIN_PARALELO linhas; 1 gera tudo
+                       em série
+            forcar: Se True, ignora o manifesto e redesenha tudo
         """
+        impressao = self._impressao_digital(df)
+        manifesto = self._ler_manifesto()
+        reaproveitados = {
+            chave: self.pasta_saida / item["arquivo"]
+            for chave, item in manifesto.items()
+            if not forcar
+            and item.get("impressao") == impressao
+            and (self.pasta_saida / item["arquivo"]).is_file()
+        }
+
+        pendentes = [
+            grupo for grupo in self._GRUPOS
+            if not all(chave in reaproveitados for chave, _ in grupo)
+        ]
+        gerados = self._renderizar_grupos(df, pendentes, processos) if pendentes else {}
+
         caminhos = {}
-        caminhos["receita_diaria"] = self.grafico_receita_diaria(df)
-        caminhos["receita_mensal"] = self.grafico_receita_mensal(df)
-        caminhos["receita_dia_semana"] = self.grafico_receita_por_dia_semana(df)
-        caminhos["top_produtos"] = self.grafico_top_produtos(df)
-        caminhos["distribuicao_ticket"] = self.grafico_distribuicao_ticket(df)
-        caminhos["distribuicao_ticket_seaborn"] = self.grafico_distribuicao_ticket_seaborn(df)
-        heatmap = self.grafico_heatmap_mes_semana(df)
-        if heatmap is not None:
-            caminhos["heatmap_mes_semana"] = heatmap
+        for grupo in self._GRUPOS:
+            for chave, _ in grupo:
+                caminho = gerados.get(chave, reaproveitados.get(chave))
+                if caminho is not None:
+                    caminhos[chave] = caminho
+
+        if gerados:
+            for chave, caminho in gerados.items():
+                if caminho is None:
+                    manifesto.pop(chave, None)
+                else:
+                    manifesto[chave] = {"impressao": impressao, "arquivo": Path(caminho).name}
+            self._salvar_manifesto(manifesto)
+        if len(caminhos) > len(gerados):
+            print(f"♻️ {len(caminhos) - len(gerados)} gráficos reaproveitados (dados inalterados).")
 
         # Transformar para caminhos relativos a partir da pasta output
         caminhos_relativos = {
@@ -205,3 +706,106 @@ class GraficosVendas:
             for chave, caminho in caminhos.items()
         }
         return caminhos_relativos
+
+    def _renderizar_grupos(
+        self, df: pd.DataFrame, grupos: list, processos: Optional[int]
+    ) -> Dict[str, Optional[Path]]:
+        """Desenha os grupos de gráficos, em série ou no pool de processos."""
+        agregados = self._agregar(df)
+        receita = df[["receita"]]
+        argumentos = {
+            "receita_diaria": (None, agregados["diaria"]),
+            "receita_mensal": (None, agregados["mensal"]),
+            "receita_dia_semana": (None, agregados["semana"]),
+            "top_produtos": (None, 10, agregados["produto"]),
+            "distribuicao_ticket": (receita,),
+            "distribuicao_ticket_seaborn": (receita,),
+            # chaves 0-6 e 1-12 cabem em int8: tabela hash do groupby e
+            # cópia enviada ao processo menores (a receita, dinheiro,
+            # continua float64)
+            "heatmap_mes_semana": (
+                df[["dia_semana", "mes", "receita"]].astype(
+                    {"dia_semana": np.int8, "mes": np.int8}
+                ),
+            ),
+        }
+        tarefas = [
+            [(chave, metodo, argumentos[chave]) for chave, metodo in grupo]
+            for grupo in grupos
+        ]
+
+        if processos is None:
+            processos = (os.cpu_count() or 1) if len(df) >= self.LINHAS_MIN_PARALELO else 1
+        processos = min(processos, len(tarefas))
+
+        caminhos = {}
+        if processos <= 1:
+            with self._escrita_em_segundo_plano():
+                for tarefa in tarefas:
+                    caminhos.update(_renderizar(self.pasta_saida, tarefa, self))
+        else:
+            contexto = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as pool:
+                futuros = [pool.submit(_renderizar, self.pasta_saida, tarefa) for tarefa in tarefas]
+                for futuro in futuros:
+                    caminhos.update(futuro.result())
+        self.fechar()
+        return caminhos
+
+    # ------------------------------------------------------------------ #
+    # Manifesto (cache dos PNGs entre execuções)
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _impressao_digital(df: pd.DataFrame) -> str:
+        """Hash das colunas que os gráficos usam (independe do índice)."""
+        colunas = [c for c in _COLUNAS_GRAFICOS if c in df.columns]
+        hashes = pd.util.hash_pandas_object(df[colunas], index=False).to_numpy()
+        digest = hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+        return f"{_VERSAO_GRAFICOS}-{digest}"
+
+    def _ler_manifesto(self) -> Dict[str, Dict[str, str]]:
+        """
+        Lê o manifesto; se não existir ou estiver corrompido, parte do zero.
+        Entradas fora do formato {"impressao": str, "arquivo": str} são
+        descartadas (os gráficos delas são redesenhados).
+        """
+        try:
+            manifesto = json.loads((self.pasta_saida / _ARQUIVO_MANIFESTO).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifesto, dict):
+            return {}
+        return {
+            chave: item
+            for chave, item in manifesto.items()
+            if isinstance(item, dict)
+            and isinstance(item.get("impressao"), str)
+            and isinstance(item.get("arquivo"), str)
+        }
+
+    def _salvar_manifesto(self, manifesto: Dict[str, Dict[str, str]]):
+        (self.pasta_saida / _ARQUIVO_MANIFESTO).write_text(
+            json.dumps(manifesto, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+
+
+def _renderizar(pasta_saida: Path, grupo: list, graficos: Optional[GraficosVendas] = None) -> dict:
+    """
+    Executa em série os gráficos de um grupo de gerar_todos.
+
+    Nos processos do pool cria o próprio GraficosVendas (figura própria)
+    e a libera no fim; em série reaproveita a instância recebida.
+    """
+    proprio = graficos is None
+    if proprio:
+        graficos = GraficosVendas(str(pasta_saida))
+    try:
+        with graficos._escrita_em_segundo_plano():
+            return {
+                chave: getattr(graficos, metodo)(*argumentos)
+                for chave, metodo, argumentos in grupo
+            }
+    finally:
+        if proprio:
+            graficos.fechar()